@@ -28,7 +28,7 @@
 
 """Flask app to analyze BIND DNS queries from syslog input."""
 
-from flask import Flask, request
+from flask import Flask, abort, request
 import dnscl_api as dnscl
 
 app = Flask(__name__)
@@ -52,6 +52,14 @@ def get_domain_input():
     return domain
 
 
+def get_top_input():
+    """Get number of results input."""
+    top = request.args.get("top", 0, type=int)
+    if top < 0:
+        abort(400, description="top must be 0 or greater")
+    return top
+
+
 @app.after_request
 def convert_to_text(results):
     """Convert results returned into text."""
@@ -65,10 +73,10 @@ def dnscl_home_page():
     help_str = ""
     help_str += "dnscl API - Analyze BIND DNS query data from Flask app\n"
     help_str += "\nendpoints:\n"
-    help_str += "/ip?search=ip&domain=domain\n"
-    help_str += "/domain?search=domain&ip=ip\n"
-    help_str += "/rpz?search=domain\n"
-    help_str += "/type?search=type\n"
+    help_str += "/ip?search=ip&domain=domain&top=number\n"
+    help_str += "/domain?search=domain&ip=ip&top=number\n"
+    help_str += "/rpz?search=domain&top=number\n"
+    help_str += "/type?search=type&top=number\n"
     help_str += "\nusage examples:\n"
     help_str += "return all domains queried by any ip address\n"
     help_str += "http://127.0.0.1:5000/ip\n"
@@ -78,6 +86,8 @@ def dnscl_home_page():
     help_str += "http://127.0.0.1:5000/ip?domain=google\n"
     help_str += "\nreturn domains containing 'amazon' queried by 192.168.0.1\n"
     help_str += "http://127.0.0.1:5000/ip?search=192.168.0.1&domain=amazon\n"
+    help_str += "\nreturn the 10 domains queried most by any ip address\n"
+    help_str += "http://127.0.0.1:5000/ip?top=10\n"
     return help_str
 
 
@@ -87,15 +97,16 @@ def dnscl_ip_page():
     wildcard = ""
     search = get_input()
     domain = get_domain_input()
+    top = get_top_input()
     if search:
         if domain:
-            results = dnscl.dnscl_ipaddress(search, domain)
+            results = dnscl.dnscl_ipaddress(search, domain, top=top)
         else:
-            results = dnscl.dnscl_ipaddress(search)
+            results = dnscl.dnscl_ipaddress(search, top=top)
     elif domain:
-        results = dnscl.dnscl_ipaddress(wildcard, domain)
+        results = dnscl.dnscl_ipaddress(wildcard, domain, top=top)
     else:
-        results = dnscl.dnscl_ipaddress(wildcard)
+        results = dnscl.dnscl_ipaddress(wildcard, top=top)
     return results
 
 
@@ -105,15 +116,16 @@ def dnscl_domain_page():
     wildcard = ""
     search = get_input()
     ip_addr = get_ip_input()
+    top = get_top_input()
     if search:
         if ip_addr:
-            results = dnscl.dnscl_domain(search, ip_addr)
+            results = dnscl.dnscl_domain(search, ip_addr, top=top)
         else:
-            results = dnscl.dnscl_domain(search)
+            results = dnscl.dnscl_domain(search, top=top)
     elif ip_addr:
-        results = dnscl.dnscl_domain(wildcard, ip_addr)
+        results = dnscl.dnscl_domain(wildcard, ip_addr, top=top)
     else:
-        results = dnscl.dnscl_domain(wildcard)
+        results = dnscl.dnscl_domain(wildcard, top=top)
     return results
 
 
@@ -122,10 +134,11 @@ def dnscl_rpz_page():
     """Endpoint to return RPZ names queried by a client IP address."""
     wildcard = ""
     search = get_input()
+    top = get_top_input()
     if search:
-        results = dnscl.dnscl_rpz_domain(search)
+        results = dnscl.dnscl_rpz_domain(search, top=top)
     else:
-        results = dnscl.dnscl_rpz(wildcard)
+        results = dnscl.dnscl_rpz(wildcard, top=top)
     return results
 
 
@@ -134,10 +147,11 @@ def dnscl_type_page():
     """Endpoint to return RPZ names queried by a client IP address."""
     wildcard = ""
     search = get_input()
+    top = get_top_input()
     if search:
-        results = dnscl.dnscl_record_type(search)
+        results = dnscl.dnscl_record_type(search, top=top)
     else:
-        results = dnscl.dnscl_record_domain(wildcard)
+        results = dnscl.dnscl_record_domain(wildcard, top=top)
     return results
 
 
@@ -28,12 +28,25 @@
 
 """This program analyzes BIND DNS queries from syslog input."""
 import sys
+import os
+import stat
 import pathlib
 import timeit
-from collections import defaultdict
+from collections import Counter, OrderedDict
 import re
 import argparse
-from typing import DefaultDict, List
+from typing import Callable, List, NamedTuple
+from dnscl_scan import (
+    ENCODING,
+    run_scan,
+    scan_domain,
+    scan_ipaddress,
+    scan_record_domain,
+    scan_record_ip,
+    scan_record_type,
+    scan_rpz,
+    scan_rpz_domain,
+)
 
 # from pyfiglet import print_figlet
 
@@ -41,6 +54,25 @@ __author__ = "Mark W. Hunter"
 __version__ = "0.63"
 FILENAME = "/var/log/syslog"  # default path to syslog file
 # FILENAME = "/var/log/messages"  # path to alternate syslog file
+SCAN_CACHE_SIZE = 32  # number of searches to keep results of
+# results of each search, by scan, syslog file, file id and search terms
+scan_cache: "OrderedDict[tuple, tuple]" = OrderedDict()
+
+
+class SearchOptions(NamedTuple):
+    """Options of a search that do not change what it matches.
+
+    Attributes:
+        jobs (int): Number of processes to scan with. Defaults to 1.
+        top (int): Number of results to show, 0 for all. Defaults to 0.
+        search_name (str): Name to report the search as. Defaults to "", the
+            search term.
+
+    """
+
+    jobs: int = 1
+    top: int = 0
+    search_name: str = ""
 
 
 def dnscl_ipaddress(
@@ -48,6 +80,7 @@ def dnscl_ipaddress(
     filename: str,
     domain_search: str = "",
     quiet_mode: bool = False,
+    options: SearchOptions = SearchOptions(),
 ) -> int:
     """Return a domain name queried by a client IP address.
 
@@ -56,32 +89,18 @@ def dnscl_ipaddress(
         filename (str): Path to syslog file.
         domain_search (str, optional): Domain name to search. Defaults to "".
         quiet_mode (bool, optional): Enable quiet mode. Defaults to False.
+        options (SearchOptions, optional): Search options. Defaults to SearchOptions().
 
     Returns:
         int: Number of queries found.
 
     """
     start_time = timeit.default_timer()
-    domain_dict: DefaultDict = defaultdict(int)
-    line_count = 0
-    ip_address_search = ip_address + "#"
-
-    with open(filename, encoding="ISO-8859-1") as syslog:
-        for line in syslog:
-            if ip_address_search in line:
-                if "named" in line and "query:" in line:
-                    fields = line.strip().split(" ")
-                    if len(fields) > 12:
-                        domain = find_domain_field(fields)
-                        if domain_search:
-                            if re.search(domain_search, domain, re.IGNORECASE):
-                                domain_dict[domain] += 1
-                                line_count += 1
-                        else:
-                            domain_dict[domain] += 1
-                            line_count += 1
-
-    domain_list_sorted = sort_dict(domain_dict)
+    domain_dict, line_count = scan_file(
+        scan_ipaddress, filename, options.jobs, ip_address, domain_search
+    )
+
+    domain_list_sorted = sort_dict(domain_dict, options.top)
     elapsed_time = timeit.default_timer() - start_time
     print_results(ip_address, line_count, domain_list_sorted)
 
@@ -99,6 +118,7 @@ def dnscl_domain(
     filename: str,
     ip_search: str = "",
     quiet_mode: bool = False,
+    options: SearchOptions = SearchOptions(),
 ) -> int:
     """Return client IP addresses that queried a domain name.
 
@@ -107,47 +127,31 @@ def dnscl_domain(
         filename (str): Path to syslog file.
         ip_search (str, optional): IP address to search. Defaults to "".
         quiet_mode (bool, optional): Enable quiet mode. Defaults to False.
+        options (SearchOptions, optional): Search options. Defaults to SearchOptions().
 
     Returns:
         int: Number of queries found.
 
     """
     start_time = timeit.default_timer()
-    ip_dict: DefaultDict = defaultdict(int)
-    domain_dict: DefaultDict = defaultdict(int)
-    line_count = 0
-
-    with open(filename, encoding="ISO-8859-1") as syslog:
-        for line in syslog:
-            if "query:" in line:
-                fields = line.strip().split(" ")
-                ip_address_field = find_ip_field(fields).split("#")
-                ip_address = ip_address_field[0]
-                domain_name_field = find_domain_field(fields)
-                if re.search(domain_name, domain_name_field, re.IGNORECASE):
-                    if ip_search:
-                        if ip_search in line:
-                            ip_dict[ip_address] += 1
-                            domain_dict[domain_name_field] += 1
-                            line_count += 1
-                    else:
-                        ip_dict[ip_address] += 1
-                        domain_dict[domain_name_field] += 1
-                        line_count += 1
-
-    ip_list_sorted = sort_dict(ip_dict)
-    domain_list_sorted = sort_dict(domain_dict)
+    ip_dict, domain_dict, line_count = scan_file(
+        scan_domain, filename, options.jobs, domain_name, ip_search
+    )
+
+    ip_list_sorted = sort_dict(ip_dict, options.top)
+    domain_list_sorted = sort_dict(domain_dict, options.top)
     elapsed_time = timeit.default_timer() - start_time
+    search_name = options.search_name or domain_name
 
     if domain_name:
-        print_results(domain_name, line_count, ip_list_sorted, domain_list_sorted)
+        print_results(search_name, line_count, ip_list_sorted, domain_list_sorted)
     else:
-        print_results(domain_name, line_count, ip_list_sorted)
+        print_results(search_name, line_count, ip_list_sorted)
 
     if not quiet_mode:
         if domain_name:
             print(
-                f"\nSummary: Searched {domain_name} and found {line_count}",
+                f"\nSummary: Searched {search_name} and found {line_count}",
                 f"queries for {len(domain_dict)} domain names",
                 f"from {len(ip_dict)} clients.",
             )
@@ -160,33 +164,24 @@ def dnscl_domain(
     return line_count
 
 
-def dnscl_rpz(ip_address: str, filename: str) -> int:
+def dnscl_rpz(
+    ip_address: str, filename: str, options: SearchOptions = SearchOptions()
+) -> int:
     """Return RPZ names queried by a client IP address.
 
     Args:
         ip_address (str): IP address to search.
         filename (str): Path to syslog file.
+        options (SearchOptions, optional): Search options. Defaults to SearchOptions().
 
     Returns:
         int: Number of queries found.
 
     """
     start_time = timeit.default_timer()
-    rpz_dict: DefaultDict = defaultdict(int)
-    line_count = 0
-    ip_address_search = ip_address + "#"
-    with open(filename, encoding="ISO-8859-1") as syslog:
-        for line in syslog:
-            if ip_address_search in line:
-                if "QNAME" in line and "SOA" not in line:
-                    fields = line.strip().split(" ")
-                    rpz_domain_fields = find_rpz_domain_field(fields).split("/")
-                    rpz_domain = rpz_domain_fields[0]
-                    if len(fields) > 11:
-                        rpz_dict[rpz_domain] += 1
-                        line_count += 1
-
-    rpz_list_sorted = sort_dict(rpz_dict)
+    rpz_dict, line_count = scan_file(scan_rpz, filename, options.jobs, ip_address)
+
+    rpz_list_sorted = sort_dict(rpz_dict, options.top)
     elapsed_time = timeit.default_timer() - start_time
     print_results(ip_address, line_count, rpz_list_sorted)
 
@@ -198,47 +193,35 @@ def dnscl_rpz(ip_address: str, filename: str) -> int:
     return line_count
 
 
-def dnscl_rpz_domain(domain_rpz_name: str, filename: str) -> int:
+def dnscl_rpz_domain(
+    domain_rpz_name: str, filename: str, options: SearchOptions = SearchOptions()
+) -> int:
     """Return client IP addresses that queried a RPZ domain name.
 
     Args:
         domain_rpz_name (str): RPZ domain name to search.
         filename (str): Path to syslog file.
+        options (SearchOptions, optional): Search options. Defaults to SearchOptions().
 
     Returns:
         int: Number of queries found.
 
     """
     start_time = timeit.default_timer()
-    rpz_ip_dict: DefaultDict = defaultdict(int)
-    rpz_domain_list = []
-    line_count = 0
-
-    with open(filename, encoding="ISO-8859-1") as syslog:
-        for line in syslog:
-            if domain_rpz_name in line:
-                if "QNAME" in line and "SOA" not in line:
-                    fields = line.strip().split(" ")
-                    if domain_rpz_name.lower() in line.lower() and len(fields) > 11:
-                        ip_address_field = find_rpz_ip_field(fields).split("#")
-                        ip_address = ip_address_field[0]
-                        rpz_domain_fields = find_rpz_domain_field(fields).split("/")
-                        rpz_domain = rpz_domain_fields[0]
-                        rpz_ip_dict[ip_address] += 1
-                        if domain_rpz_name:
-                            rpz_domain_list.append(rpz_domain)
-                        line_count += 1
-
-    rpz_ip_list_sorted = sort_dict(rpz_ip_dict)
-    rpz_domain_set = sorted(set(rpz_domain_list))
+    rpz_ip_dict, rpz_domain_set, line_count = scan_file(
+        scan_rpz_domain, filename, options.jobs, domain_rpz_name
+    )
+
+    rpz_ip_list_sorted = sort_dict(rpz_ip_dict, options.top)
     elapsed_time = timeit.default_timer() - start_time
     print_results(domain_rpz_name, line_count, rpz_ip_list_sorted)
 
     if domain_rpz_name:
         print("\nrpz names: ")
 
-        for domain_names_found in rpz_domain_set:
-            print(domain_names_found)
+        sys.stdout.write(
+            "".join(f"{name.decode(ENCODING)}\n" for name in sorted(rpz_domain_set))
+        )
 
     print(
         f"\nSummary: Searched {domain_rpz_name} and found {line_count}",
@@ -248,255 +231,186 @@ def dnscl_rpz_domain(domain_rpz_name: str, filename: str) -> int:
     return line_count
 
 
-def dnscl_record_ip(ip_address: str, filename) -> int:
+def dnscl_record_ip(
+    ip_address: str, filename, options: SearchOptions = SearchOptions()
+) -> int:
     """Return record types queried by a client IP address.
 
     Args:
         ip_address (str): IP address to search.
         filename (str): Path to syslog file.
+        options (SearchOptions, optional): Search options. Defaults to SearchOptions().
 
     Returns:
         int: Number of queries found.
 
     """
     start_time = timeit.default_timer()
-    record_dict: DefaultDict = defaultdict(int)
-    domain_list = []
-    line_count = 0
-    ip_address_search = ip_address + "#"
-
-    with open(filename, encoding="ISO-8859-1") as syslog:
-        for line in syslog:
-            if ip_address_search in line:
-                if "query:" in line:
-                    fields = line.strip().split(" ")
-                    record_type = find_record_type_field(fields)
-                    if len(fields) > 12:
-                        record_dict[record_type] += 1
-                        domain_list.append(find_domain_field(fields))
-                        line_count += 1
-
-    record_list_sorted = sort_dict(record_dict)
+    record_dict, domain_set, line_count = scan_file(
+        scan_record_ip, filename, options.jobs, ip_address
+    )
+
+    record_list_sorted = sort_dict(record_dict, options.top)
     elapsed_time = timeit.default_timer() - start_time
     print_results(ip_address, line_count, record_list_sorted)
 
     if ip_address:
         print("\ndomain names: ")
-        for domain_names_found in sorted(set(domain_list)):
-            print(domain_names_found)
+        sys.stdout.write(
+            "".join(f"{name.decode(ENCODING)}\n" for name in sorted(domain_set))
+        )
 
     print(
         f"\nSummary: Searched {ip_address} and found {line_count}",
-        f"queries with {len(set(record_dict))} record types for {len(set(domain_list))}",
+        f"queries with {len(record_dict)} record types for {len(domain_set)}",
         "domains.",
     )
     print(f"Search time: {round(elapsed_time, 2)} seconds")
     return line_count
 
 
-def dnscl_record_domain(domain_name: str, filename: str) -> int:
+def dnscl_record_domain(
+    domain_name: str, filename: str, options: SearchOptions = SearchOptions()
+) -> int:
     """Return record types for a queried domain name.
 
     Args:
         domain_name (str): Domain name to search.
         filename (str): Path to syslog file.
+        options (SearchOptions, optional): Search options. Defaults to SearchOptions().
 
     Returns:
         int: Number of queries found.
 
     """
     start_time = timeit.default_timer()
-    record_dict: DefaultDict = defaultdict(int)
-    ip_list = []
-    domain_list = []
-    line_count = 0
-
-    with open(filename, encoding="ISO-8859-1") as syslog:
-        for line in syslog:
-            fields = line.strip().split(" ")
-            if domain_name.lower() in line.lower() and "query:" in line:
-                ip_address = find_ip_field(fields).split("#")
-                ip_list.append(ip_address[0])
-                record_type = find_record_type_field(fields)
-                record_dict[record_type] += 1
-                if domain_name:
-                    domain_list.append(find_domain_field(fields))
-                line_count += 1
-
-    record_list_sorted = sort_dict(record_dict)
+    record_dict, ip_set, domain_set, line_count = scan_file(
+        scan_record_domain, filename, options.jobs, domain_name
+    )
+
+    record_list_sorted = sort_dict(record_dict, options.top)
     elapsed_time = timeit.default_timer() - start_time
     print_results(domain_name, line_count, record_list_sorted)
 
     if domain_name:
         print("\ndomain names: ")
-        for domain_names_found in sorted(set(domain_list)):
-            print(domain_names_found)
+        sys.stdout.write(
+            "".join(f"{name.decode(ENCODING)}\n" for name in sorted(domain_set))
+        )
 
         print("\nip addresses: ")
-        for ip_addresses_found in sorted(set(ip_list)):
-            print(ip_addresses_found)
+        sys.stdout.write(
+            "".join(f"{ip.decode(ENCODING)}\n" for ip in sorted(ip_set))
+        )
 
     print(
         f"\nSummary: Searched {domain_name} and found {line_count}",
-        f"queries for {len(record_dict)} record types from {len(set(ip_list))} clients.",
+        f"queries for {len(record_dict)} record types from {len(ip_set)} clients.",
     )
     print(f"Search time: {round(elapsed_time, 2)} seconds")
     return line_count
 
 
-def dnscl_record_type(record_type: str, filename: str) -> int:
+def dnscl_record_type(
+    record_type: str, filename: str, options: SearchOptions = SearchOptions()
+) -> int:
     """Return domain names of a particular record type.
 
     Args:
         record_type (str): Record type to search.
         filename (str): Path to syslog file.
+        options (SearchOptions, optional): Search options. Defaults to SearchOptions().
 
     Returns:
         int: Number of queries found.
 
     """
     start_time = timeit.default_timer()
-    record_domain_dict: DefaultDict = defaultdict(int)
-    record_ip_list = []
-    line_count = 0
-
-    with open(filename, encoding="ISO-8859-1") as syslog:
-        for line in syslog:
-            if "query:" in line:
-                fields = line.strip().split(" ")
-                if record_type.upper() == find_record_type_field(fields):
-                    record_domain = find_domain_field(fields)
-                    record_domain_dict[record_domain] += 1
-                    ip_address = find_ip_field(fields).split("#")
-                    record_ip_list.append(ip_address[0])
-                    line_count += 1
-
-    record_domain_list_sorted = sort_dict(record_domain_dict)
+    record_domain_dict, record_ip_set, line_count = scan_file(
+        scan_record_type, filename, options.jobs, record_type
+    )
+
+    record_domain_list_sorted = sort_dict(record_domain_dict, options.top)
     elapsed_time = timeit.default_timer() - start_time
     print_results(record_type.upper(), line_count, record_domain_list_sorted)
 
     print("\nip addresses: ")
-    for ip_addresses_found in set(record_ip_list):
-        print(ip_addresses_found)
+    sys.stdout.write("".join(f"{ip.decode(ENCODING)}\n" for ip in record_ip_set))
 
     print(
         f"\nSummary: Searched record type {record_type.upper()} and found",
         f"{line_count} queries for",
         f"{len(record_domain_dict)} domains from",
-        f"{len(set(record_ip_list))} clients.",
+        f"{len(record_ip_set)} clients.",
     )
     print("Search time:", str(round(elapsed_time, 2)), "seconds")
     return line_count
 
 
-def find_domain_field(fields: List[str]):
-    """Find and return domain field value.
-
-    Args:
-        fields (List[str]): Fields from line.
-
-    Returns:
-        str: Domain name field value.
-
-    """
-    field_index = 0
-    for field in fields:
-        if field == "query:":
-            field_value = fields[field_index + 1]
-            return field_value
-        field_index += 1
-    return None
-
-
-def find_ip_field(fields: List[str]):
-    """Find and return IP address field value.
+def scan_file(scan: Callable, filename: str, jobs: int, *args) -> tuple:
+    """Run a syslog scan, reusing results while syslog file is unchanged.
 
     Args:
-        fields (List[str]): Fields from line.
-
-    Returns:
-        str: IP address field value.
-
-    """
-    field_index = 0
-    for field in fields:
-        if field == "query:":
-            field_value = fields[field_index - 2]
-            return field_value
-        field_index += 1
-    return None
-
-
-def find_rpz_domain_field(fields: List[str]):
-    """Find and return RPZ domain field.
-
-    Args:
-        fields (List[str]): Fields from line.
+        scan (Callable): Scan function to run on each chunk of syslog file.
+        filename (str): Path to syslog file.
+        jobs (int): Number of processes to scan with.
+        *args: Search terms passed to scan function.
 
     Returns:
-        str: RPZ domain name field value.
+        tuple: Merged results of scan function.
 
     """
-    field_index = 0
-    for field in fields:
-        if field == "QNAME":
-            field_value = fields[field_index + 3]
-            return field_value
-        field_index += 1
-    return None
-
-
-def find_rpz_ip_field(fields: List[str]):
-    """Find and return RPZ IP address field value.
-
-    Args:
-        fields (List[str]): Fields from line.
+    file_stat = os.stat(filename)
+    if not stat.S_ISREG(file_stat.st_mode):
+        return run_scan(scan, filename, jobs, *args)
 
-    Returns:
-        str: RPZ IP address field value.
-
-    """
-    field_index = 0
-    for field in fields:
-        if field == "QNAME":
-            field_value = fields[field_index - 3]
-            return field_value
-        field_index += 1
-    return None
+    # results do not depend on jobs, only on the search and the file contents
+    file_id = (file_stat.st_mtime_ns, file_stat.st_size)
+    key = (scan, filename, file_id, *args)
+    results = scan_cache.pop(key, None)
+    if results is None:
+        results = run_scan(scan, filename, jobs, *args)
+    scan_cache[key] = results
+    while len(scan_cache) > SCAN_CACHE_SIZE:
+        scan_cache.popitem(last=False)
+    return results
 
 
-def find_record_type_field(fields: List[str]):
-    """Find and return record type field.
+def domain_list_search(filename: str) -> str:
+    """Return a search term matching any domain name listed in a file.
 
     Args:
-        fields (List[str]): Fields from line.
+        filename (str): Path to file with one domain name per line.
 
     Returns:
-        str: Record type field value.
+        str: Regular expression matching any listed domain name, empty if
+            none are listed.
 
     """
-    field_index = 0
-    for field in fields:
-        if field == "query:":
-            field_value = fields[field_index + 3]
-            return field_value
-        field_index += 1
-    return None
+    with open(filename, encoding=ENCODING) as domain_file:
+        domain_names = [
+            domain_name
+            for domain_name in map(str.strip, domain_file)
+            if domain_name and not domain_name.startswith("#")
+        ]
+    return "|".join(re.escape(domain_name) for domain_name in domain_names)
 
 
-def sort_dict(dict_unsorted: DefaultDict) -> List:
+def sort_dict(dict_unsorted: Counter, top: int = 0) -> List:
     """Sort dictionary by values in reverse order.
 
     Args:
-        dict_unsorted (DefaultDict): Unsorted search reults.
+        dict_unsorted (Counter): Unsorted search reults with bytes keys.
+        top (int, optional): Number of results to keep, 0 for all. Defaults to 0.
 
     Returns:
-        List: Sorted search results in descending order.
+        List: Sorted search results in descending order with str keys.
 
     """
-    dict_sorted = sorted(
-        dict_unsorted.items(), key=lambda dict_sort: dict_sort[1], reverse=True
-    )
+    dict_sorted = [
+        (key.decode(ENCODING), count)
+        for key, count in dict_unsorted.most_common(top or None)
+    ]
     return dict_sorted
 
 
@@ -522,21 +436,24 @@ def print_results(search: str, count: int, *results_arg: List):
             if col_width_temp > col_width:
                 col_width = col_width_temp
 
-    print(f"{search} total queries: {count}")
-    print("results:")
+    lines = [f"{search} total queries: {count}", "results:"]
 
     for results_sorted in results_arg:
         arg_count += 1
         if results_sorted:
-            try:
-                for domain_name, query_count in results_sorted:
-                    print(f"{query_count:>{col_width}}    {domain_name}")
-            except BrokenPipeError:
-                sys.exit(1)
+            lines.extend(
+                f"{query_count:>{col_width}}    {domain_name}"
+                for domain_name, query_count in results_sorted
+            )
         else:
-            print("No results found.")
+            lines.append("No results found.")
         if arg_count < len(results_arg):
-            print("")
+            lines.append("")
+
+    try:
+        sys.stdout.write("\n".join(lines) + "\n")
+    except BrokenPipeError:
+        sys.exit(1)
 
 
 def menu():
@@ -553,6 +470,73 @@ def menu():
     print("Enter 7 to search record type details")
 
 
+def create_parser() -> argparse.ArgumentParser:
+    """Create command line argument parser.
+
+    Returns:
+        argparse.ArgumentParser: Parser for the ip, domain, rpz and type commands.
+
+    """
+    wildcard = ""
+    dnscl_parser = argparse.ArgumentParser(
+        description="Analyze BIND DNS query data from syslog file input"
+    )
+    dnscl_subparser = dnscl_parser.add_subparsers(title="commands", dest="command")
+    parser_ip = dnscl_subparser.add_parser(
+        "ip", help="domains queried by an ip address"
+    )
+    parser_domain = dnscl_subparser.add_parser(
+        "domain", help="ip addresses that queried a domain"
+    )
+    parser_rpz = dnscl_subparser.add_parser("rpz", help="rpz domains queried")
+    parser_type = dnscl_subparser.add_parser("type", help="record types queried")
+    parser_ip.add_argument("-i", help="ip address", default=wildcard)
+    parser_ip.add_argument("-f", help="syslog file", default=FILENAME)
+    parser_ip.add_argument("-d", help="domain", default=wildcard)
+    parser_ip.add_argument("-q", "--quiet", help="quiet mode", action="store_true")
+    parser_ip.add_argument(
+        "-j", "--jobs", help="number of processes", type=int, default=1
+    )
+    parser_ip.add_argument(
+        "-n", "--top", help="number of results to show", type=int, default=0
+    )
+    parser_domain_search = parser_domain.add_mutually_exclusive_group()
+    parser_domain_search.add_argument("-d", help="domain", default=wildcard)
+    parser_domain_search.add_argument("-l", help="file of domains to search")
+    parser_domain.add_argument("-f", help="syslog file", default=FILENAME)
+    parser_domain.add_argument("-i", help="ip address", default=wildcard)
+    parser_domain.add_argument("-q", "--quiet", help="quiet mode", action="store_true")
+    parser_domain.add_argument(
+        "-j", "--jobs", help="number of processes", type=int, default=1
+    )
+    parser_domain.add_argument(
+        "-n", "--top", help="number of results to show", type=int, default=0
+    )
+    parser_rpz.add_argument("-r", help="rpz domain", default=wildcard)
+    parser_rpz.add_argument("-f", help="syslog file", default=FILENAME)
+    parser_rpz.add_argument(
+        "-j", "--jobs", help="number of processes", type=int, default=1
+    )
+    parser_rpz.add_argument(
+        "-n", "--top", help="number of results to show", type=int, default=0
+    )
+    parser_type.add_argument("-t", help="record type", default=wildcard)
+    parser_type.add_argument("-f", help="syslog file", default=FILENAME)
+    parser_type.add_argument(
+        "-j", "--jobs", help="number of processes", type=int, default=1
+    )
+    parser_type.add_argument(
+        "-n", "--top", help="number of results to show", type=int, default=0
+    )
+    dnscl_parser.add_argument(
+        "-v",
+        "--version",
+        action="version",
+        version="%(prog)s " + __version__ + ", " + __author__ + " (c) 2021",
+    )
+    return dnscl_parser
+
+
 def main():
     """Run main program."""
     if len(sys.argv) < 2:
@@ -605,55 +589,34 @@ def main():
             elif int(choice) == 0:
                 break
     else:
-        wildcard = ""
-        dnscl_parser = argparse.ArgumentParser(
-            description="Analyze BIND DNS query data from syslog file input"
-        )
-        dnscl_subparser = dnscl_parser.add_subparsers(title="commands", dest="command")
-        parser_ip = dnscl_subparser.add_parser(
-            "ip", help="domains queried by an ip address"
-        )
-        parser_domain = dnscl_subparser.add_parser(
-            "domain", help="ip addresses that queried a domain"
-        )
-        parser_rpz = dnscl_subparser.add_parser("rpz", help="rpz domains queried")
-        parser_type = dnscl_subparser.add_parser("type", help="record types queried")
-        parser_ip.add_argument("-i", help="ip address", default=wildcard)
-        parser_ip.add_argument("-f", help="syslog file", default=FILENAME)
-        parser_ip.add_argument("-d", help="domain", default=wildcard)
-        parser_ip.add_argument("-q", "--quiet", help="quiet mode", action="store_true")
-        parser_domain.add_argument("-d", help="domain", default=wildcard)
-        parser_domain.add_argument("-f", help="syslog file", default=FILENAME)
-        parser_domain.add_argument("-i", help="ip address", default=wildcard)
-        parser_domain.add_argument(
-            "-q", "--quiet", help="quiet mode", action="store_true"
-        )
-        parser_rpz.add_argument("-r", help="rpz domain", default=wildcard)
-        parser_rpz.add_argument("-f", help="syslog file", default=FILENAME)
-        parser_type.add_argument("-t", help="record type", default=wildcard)
-        parser_type.add_argument("-f", help="syslog file", default=FILENAME)
-        dnscl_parser.add_argument(
-            "-v",
-            "--version",
-            action="version",
-            version="%(prog)s " + __version__ + ", " + __author__ + " (c) 2021",
-        )
+        dnscl_parser = create_parser()
         args = dnscl_parser.parse_args()
+        if args.top < 0:
+            dnscl_parser.error("argument -n/--top: must not be negative")
+        options = SearchOptions(args.jobs, args.top)
 
         if args.command == "ip":
-            dnscl_ipaddress(args.i, args.f, args.d, args.quiet)
+            dnscl_ipaddress(args.i, args.f, args.d, args.quiet, options)
         elif args.command == "domain":
-            dnscl_domain(args.d, args.f, args.i, args.quiet)
+            if args.l:
+                try:
+                    args.d = domain_list_search(args.l)
+                except OSError as error:
+                    dnscl_parser.error(f"cannot read {args.l}: {error.strerror}")
+                if not args.d:
+                    dnscl_parser.error(f"no domain names found in {args.l}")
+                options = options._replace(search_name=args.l)
+            dnscl_domain(args.d, args.f, args.i, args.quiet, options)
         elif args.command == "rpz":
-            if args.r == wildcard:
-                dnscl_rpz(args.r, args.f)
+            if not args.r:
+                dnscl_rpz(args.r, args.f, options)
             else:
-                dnscl_rpz_domain(args.r, args.f)
+                dnscl_rpz_domain(args.r, args.f, options)
         elif args.command == "type":
-            if args.t == wildcard:
-                dnscl_record_domain(args.t, args.f)
+            if not args.t:
+                dnscl_record_domain(args.t, args.f, options)
             else:
-                dnscl_record_type(args.t, args.f)
+                dnscl_record_type(args.t, args.f, options)
 
 
 if __name__ == "__main__":
@@ -27,474 +27,415 @@
 # SOFTWARE.
 
 """Analyze BIND DNS queries from Flask web API."""
+import os
+import stat
 import timeit
-from collections import defaultdict
-import re
-from typing import DefaultDict, List
+import threading
+from collections import Counter, OrderedDict
+from functools import wraps
+from typing import Callable, List, Tuple
+from dnscl_scan import (
+    ENCODING,
+    merge_results,
+    run_scan,
+    scan_domain,
+    scan_ipaddress,
+    scan_record_domain,
+    scan_record_ip,
+    scan_record_type,
+    scan_rpz,
+    scan_rpz_domain,
+)
 
 __author__ = "Mark W. Hunter"
 __version__ = "0.58-api"
 FILENAME = "/var/log/syslog"  # path to syslog file
 # FILENAME = "/var/log/messages"  # path to alternate syslog file
+JOBS = 1  # number of processes to scan syslog file with
+SCAN_CACHE_SIZE = 32  # number of searches to keep results of between requests
+# file id, offset scanned to, bytes before offset and results of each search
+scan_cache: "OrderedDict[tuple, Tuple[Tuple[int, int], int, bytes, tuple]]"
+scan_cache = OrderedDict()
+# Flask may serve requests on several threads
+scan_cache_lock = threading.Lock()
 
 
-def dnscl_ipaddress(ip_address: str, domain_search: str = "") -> str:
+def query_timer(search: Callable) -> Callable:
+    """Add query time to search results.
+
+    Args:
+        search (Callable): Search function returning results as str.
+
+    Returns:
+        Callable: Search function returning results followed by query time.
+
+    """
+
+    @wraps(search)
+    def timed_search(*args, **kwargs) -> str:
+        start_time = timeit.default_timer()
+        results = search(*args, **kwargs)
+        elapsed_time = timeit.default_timer() - start_time
+        return f"{results}Query time: {round(elapsed_time, 2)} seconds\n"
+
+    return timed_search
+
+
+@query_timer
+def dnscl_ipaddress(ip_address: str, domain_search: str = "", top: int = 0) -> str:
     """Return a domain name queried by a client IP address.
 
     Args:
         ip_address (str): IP address to search.
         domain_search (str, optional): Domain name to search. Defaults to "".
+        top (int, optional): Number of results to return, 0 for all. Defaults to 0.
 
     Returns:
         str: Search results found.
 
     """
-    start_time = timeit.default_timer()
-    domain_dict: DefaultDict = defaultdict(int)
-    line_count = 0
-    ip_address_search = ip_address + "#"
-    results = ""
-
-    with open(FILENAME, encoding="ISO-8859-1") as syslog:
-        for line in syslog:
-            if ip_address_search in line:
-                if "named" in line and "query:" in line:
-                    fields = line.strip().split(" ")
-                    if len(fields) > 12:
-                        domain = find_domain_field(fields)
-                        if domain_search:
-                            if re.search(domain_search, domain, re.IGNORECASE):
-                                domain_dict[domain] += 1
-                                line_count += 1
-                        else:
-                            domain_dict[domain] += 1
-                            line_count += 1
-
-    domain_list_sorted = sort_dict(domain_dict)
-    elapsed_time = timeit.default_timer() - start_time
-    results += f"{ip_address} total queries: {line_count}\n"
-    results += "queries: \n"
+    domain_dict, line_count = scan_file(
+        scan_ipaddress, FILENAME, JOBS, ip_address, domain_search
+    )
+    results: List[str] = []
+
+    domain_list_sorted = sort_dict(domain_dict, top)
+
+    results.append(f"{ip_address} total queries: {line_count}\n")
+    results.append("queries: \n")
 
     for domain_name, query_count in domain_list_sorted:
-        results += f"{query_count} \t {domain_name}\n"
+        results.append(f"{query_count} \t {domain_name}\n")
 
-    results += f"\nSummary: Searched {ip_address} and found {line_count} "
-    results += f"queries for {len(domain_dict)} domain names.\n"
-    results += f"Query time: {round(elapsed_time, 2)} seconds\n"
-    return results
+    results.append(f"\nSummary: Searched {ip_address} and found {line_count} ")
+    results.append(f"queries for {len(domain_dict)} domain names.\n")
+    return "".join(results)
 
 
-def dnscl_domain(domain_name: str, ip_search: str = "") -> str:
+@query_timer
+def dnscl_domain(domain_name: str, ip_search: str = "", top: int = 0) -> str:
     """Return client IP addresses that queried a domain name.
 
     Args:
         domain_name (str): Domain name to search.
         ip_search (str, optional): IP address to search. Defaults to "".
+        top (int, optional): Number of results to return, 0 for all. Defaults to 0.
 
     Returns:
         str: Search results found.
 
     """
-    start_time = timeit.default_timer()
-    ip_dict: DefaultDict = defaultdict(int)
-    domain_list = []
-    line_count = 0
-    results = ""
-
-    with open(FILENAME, encoding="ISO-8859-1") as syslog:
-        for line in syslog:
-            if "query:" in line:
-                fields = line.strip().split(" ")
-                ip_address_field = find_ip_field(fields).split("#")
-                ip_address = ip_address_field[0]
-                domain_name_field = find_domain_field(fields)
-                if re.search(domain_name, domain_name_field, re.IGNORECASE):
-                    if ip_search:
-                        if ip_search in line:
-                            ip_dict[ip_address] += 1
-                            domain_list.append(domain_name_field)
-                            line_count += 1
-                    else:
-                        ip_dict[ip_address] += 1
-                        domain_list.append(domain_name_field)
-                        line_count += 1
-
-    ip_list_sorted = sort_dict(ip_dict)
-    domain_set = sorted(set(domain_list))
-    elapsed_time = timeit.default_timer() - start_time
-
-    results += f"{domain_name} total queries: {line_count}\n"
-    results += "queries: \n"
+    ip_dict, domain_dict, line_count = scan_file(
+        scan_domain, FILENAME, JOBS, domain_name, ip_search
+    )
+    results: List[str] = []
+
+    ip_list_sorted = sort_dict(ip_dict, top)
+
+    results.append(f"{domain_name} total queries: {line_count}\n")
+    results.append("queries: \n")
 
     for ip_address, query_count in ip_list_sorted:
-        results += f"{query_count} \t {ip_address}\n"
+        results.append(f"{query_count} \t {ip_address}\n")
 
     if domain_name:
-        results += "\ndomain names:\n"
-        for domain_names_found in domain_set:
-            results += f"{domain_names_found}\n"
-        results += f"\nSummary: Searched {domain_name} and found {line_count} queries "
-        results += f"for {len(domain_set)} domain names from {len(ip_dict)} clients.\n"
-        results += f"Query time: {round(elapsed_time, 2)} seconds\n"
+        results.append("\ndomain names:\n")
+        for domain_names_found in sorted(domain_dict):
+            results.append(f"{domain_names_found.decode(ENCODING)}\n")
+        results.append(
+            f"\nSummary: Searched {domain_name} and found {line_count} queries "
+        )
+        results.append(
+            f"for {len(domain_dict)} domain names from {len(ip_dict)} clients.\n"
+        )
     else:
-        results += f"\nSummary: Searched {domain_name} and found {line_count} "
-        results += f"queries from {len(ip_dict)} clients.\n"
-        results += f"Query time: {round(elapsed_time, 2)} seconds\n"
-    return results
+        results.append(f"\nSummary: Searched {domain_name} and found {line_count} ")
+        results.append(f"queries from {len(ip_dict)} clients.\n")
+    return "".join(results)
 
 
-def dnscl_rpz(ip_address: str) -> str:
+@query_timer
+def dnscl_rpz(ip_address: str, top: int = 0) -> str:
     """Return RPZ names queried by a client IP address.
 
     Args:
         ip_address (str): IP address to search.
+        top (int, optional): Number of results to return, 0 for all. Defaults to 0.
 
     Returns:
         str: Search results found.
 
     """
-    start_time = timeit.default_timer()
-    rpz_dict: DefaultDict = defaultdict(int)
-    line_count = 0
-    ip_address_search = ip_address + "#"
-    results = ""
-
-    with open(FILENAME, encoding="ISO-8859-1") as syslog:
-        for line in syslog:
-            if ip_address_search in line:
-                if "QNAME" in line and "SOA" not in line:
-                    fields = line.strip().split(" ")
-                    rpz_domain_fields = find_rpz_domain_field(fields).split("/")
-                    rpz_domain = rpz_domain_fields[0]
-                    if len(fields) > 11:
-                        rpz_dict[rpz_domain] += 1
-                        line_count += 1
-
-    rpz_list_sorted = sort_dict(rpz_dict)
-    elapsed_time = timeit.default_timer() - start_time
-
-    results += f"{ip_address} total queries: {line_count}\n"
-    results += "queries: \n"
+    rpz_dict, line_count = scan_file(scan_rpz, FILENAME, JOBS, ip_address)
+    results: List[str] = []
+
+    rpz_list_sorted = sort_dict(rpz_dict, top)
+
+    results.append(f"{ip_address} total queries: {line_count}\n")
+    results.append("queries: \n")
 
     for domain_name, query_count in rpz_list_sorted:
-        results += f"{query_count} \t {domain_name}\n"
+        results.append(f"{query_count} \t {domain_name}\n")
 
-    results += f"\nSummary: Searched {ip_address} and found {line_count} "
-    results += f"queries for {len(rpz_dict)} domain names.\n"
-    results += f"Query time: {round(elapsed_time, 2)} seconds\n"
-    return results
+    results.append(f"\nSummary: Searched {ip_address} and found {line_count} ")
+    results.append(f"queries for {len(rpz_dict)} domain names.\n")
+    return "".join(results)
 
 
-def dnscl_rpz_domain(domain_rpz_name: str) -> str:
+@query_timer
+def dnscl_rpz_domain(domain_rpz_name: str, top: int = 0) -> str:
     """Return client IP addresses that queried a RPZ domain name.
 
     Args:
         domain_rpz_name (str): RPZ domain name to search.
+        top (int, optional): Number of results to return, 0 for all. Defaults to 0.
 
     Returns:
         int: Number of queries found.
 
     """
-    start_time = timeit.default_timer()
-    rpz_ip_dict: DefaultDict = defaultdict(int)
-    rpz_domain_list = []
-    line_count = 0
-    results = ""
-
-    with open(FILENAME, encoding="ISO-8859-1") as syslog:
-        for line in syslog:
-            if domain_rpz_name in line:
-                if "QNAME" in line and "SOA" not in line:
-                    fields = line.strip().split(" ")
-                    if domain_rpz_name.lower() in line.lower() and len(fields) > 11:
-                        ip_address_field = find_rpz_ip_field(fields).split("#")
-                        ip_address = ip_address_field[0]
-                        rpz_domain_fields = find_rpz_domain_field(fields).split("/")
-                        rpz_domain = rpz_domain_fields[0]
-                        rpz_ip_dict[ip_address] += 1
-                        if domain_rpz_name:
-                            rpz_domain_list.append(rpz_domain)
-                        line_count += 1
-
-    rpz_ip_list_sorted = sort_dict(rpz_ip_dict)
-    rpz_domain_set = sorted(set(rpz_domain_list))
-    elapsed_time = timeit.default_timer() - start_time
-
-    results += f"{domain_rpz_name} total queries: {line_count}\n"
-    results += "ip addresses: \n"
+    rpz_ip_dict, rpz_domain_set, line_count = scan_file(
+        scan_rpz_domain, FILENAME, JOBS, domain_rpz_name
+    )
+    results: List[str] = []
+
+    rpz_ip_list_sorted = sort_dict(rpz_ip_dict, top)
+
+    results.append(f"{domain_rpz_name} total queries: {line_count}\n")
+    results.append("ip addresses: \n")
 
     for ip_address, query_count in rpz_ip_list_sorted:
-        results += f"{query_count} \t {ip_address}\n"
+        results.append(f"{query_count} \t {ip_address}\n")
 
     if domain_rpz_name:
-        results += "\nrpz names:\n"
+        results.append("\nrpz names:\n")
 
-        for domain_names_found in rpz_domain_set:
-            results += f"{domain_names_found}\n"
+        for domain_names_found in sorted(rpz_domain_set):
+            results.append(f"{domain_names_found.decode(ENCODING)}\n")
 
-    results += f"\nSummary: Searched {domain_rpz_name} and found {line_count} "
-    results += f"queries from {len(rpz_ip_dict)} clients.\n"
-    results += f"Query time: {round(elapsed_time, 2)} seconds\n"
-    return results
+    results.append(f"\nSummary: Searched {domain_rpz_name} and found {line_count} ")
+    results.append(f"queries from {len(rpz_ip_dict)} clients.\n")
+    return "".join(results)
 
 
-def dnscl_record_ip(ip_address: str) -> str:
+@query_timer
+def dnscl_record_ip(ip_address: str, top: int = 0) -> str:
     """Return record types queried by a client IP address.
 
     Args:
         ip_address (str): IP address to search.
+        top (int, optional): Number of results to return, 0 for all. Defaults to 0.
 
     Returns:
         str: Search results found.
 
     """
-    start_time = timeit.default_timer()
-    record_dict: DefaultDict = defaultdict(int)
-    domain_list = []
-    line_count = 0
-    ip_address_search = ip_address + "#"
-    results = ""
-
-    with open(FILENAME, encoding="ISO-8859-1") as syslog:
-        for line in syslog:
-            if ip_address_search in line:
-                if "query:" in line:
-                    fields = line.strip().split(" ")
-                    record_type = find_record_type_field(fields)
-                    if len(fields) > 12:
-                        record_dict[record_type] += 1
-                        domain_list.append(find_domain_field(fields))
-                        line_count += 1
-
-    record_list_sorted = sort_dict(record_dict)
-    elapsed_time = timeit.default_timer() - start_time
-
-    results += f"{ip_address} total queries: {line_count}\n"
-    results += "queries: \n"
+    record_dict, domain_set, line_count = scan_file(
+        scan_record_ip, FILENAME, JOBS, ip_address
+    )
+    results: List[str] = []
+
+    record_list_sorted = sort_dict(record_dict, top)
+
+    results.append(f"{ip_address} total queries: {line_count}\n")
+    results.append("queries: \n")
 
     for record_type, query_count in record_list_sorted:
-        results += f"{query_count} \t {record_type}\n"
+        results.append(f"{query_count} \t {record_type}\n")
 
     if ip_address:
-        results += "\ndomain names: \n"
-        for domain_names_found in sorted(set(domain_list)):
-            results += f"{domain_names_found}\n"
+        results.append("\ndomain names: \n")
+        for domain_names_found in sorted(domain_set):
+            results.append(f"{domain_names_found.decode(ENCODING)}\n")
 
-    results += f"\nSummary: Searched {ip_address} and found {line_count} "
-    results += (
-        "queries with {len(set(record_dict))} record types for {len(set(domain_list))} "
+    results.append(f"\nSummary: Searched {ip_address} and found {line_count} ")
+    results.append(
+        f"queries with {len(record_dict)} record types for {len(domain_set)} "
     )
-    results += "domains.\n"
-    results += f"Query time: {round(elapsed_time, 2)} seconds\n"
-    return results
+    results.append("domains.\n")
+    return "".join(results)
 
 
-def dnscl_record_domain(domain_name: str) -> str:
+@query_timer
+def dnscl_record_domain(domain_name: str, top: int = 0) -> str:
     """Return record types for a queried domain name.
 
     Args:
         domain_name (str): Domain name to search.
+        top (int, optional): Number of results to return, 0 for all. Defaults to 0.
 
     Returns:
         str: Search results found.
 
     """
-    start_time = timeit.default_timer()
-    record_dict: DefaultDict = defaultdict(int)
-    ip_list = []
-    domain_list = []
-    line_count = 0
-    results = ""
-
-    with open(FILENAME, encoding="ISO-8859-1") as syslog:
-        for line in syslog:
-            fields = line.strip().split(" ")
-            if domain_name.lower() in line.lower() and "query:" in line:
-                ip_address = find_ip_field(fields).split("#")
-                ip_list.append(ip_address[0])
-                record_type = find_record_type_field(fields)
-                record_dict[record_type] += 1
-                if domain_name:
-                    domain_list.append(find_domain_field(fields))
-                line_count += 1
-
-    record_list_sorted = sort_dict(record_dict)
-    elapsed_time = timeit.default_timer() - start_time
-
-    results += f"{domain_name} total queries: {line_count}\n"
-    results += "record types: \n"
+    record_dict, ip_set, domain_set, line_count = scan_file(
+        scan_record_domain, FILENAME, JOBS, domain_name
+    )
+    results: List[str] = []
+
+    record_list_sorted = sort_dict(record_dict, top)
+
+    results.append(f"{domain_name} total queries: {line_count}\n")
+    results.append("record types: \n")
 
     for record_type, query_count in record_list_sorted:
-        results += f"{query_count} \t {record_type}\n"
+        results.append(f"{query_count} \t {record_type}\n")
 
     if domain_name:
-        results += "\ndomain names:\n"
-        for domain_names_found in sorted(set(domain_list)):
-            results += f"{domain_names_found}\n"
+        results.append("\ndomain names:\n")
+        for domain_names_found in sorted(domain_set):
+            results.append(f"{domain_names_found.decode(ENCODING)}\n")
 
-        results += "\nip addresses: \n"
-        for ip_addresses_found in sorted(set(ip_list)):
-            results += f"{ip_addresses_found}\n"
+        results.append("\nip addresses: \n")
+        for ip_addresses_found in sorted(ip_set):
+            results.append(f"{ip_addresses_found.decode(ENCODING)}\n")
 
-    results += f"\nSummary: Searched {domain_name} and found {line_count} "
-    results += f"queries for {len(record_dict)} record types from {len(set(ip_list))} clients.\n"
-    results += f"Query time: {round(elapsed_time, 2)} seconds\n"
-    return results
+    results.append(f"\nSummary: Searched {domain_name} and found {line_count} ")
+    results.append(
+        f"queries for {len(record_dict)} record types from {len(ip_set)} clients.\n"
+    )
+    return "".join(results)
 
 
-def dnscl_record_type(record_type: str) -> str:
+@query_timer
+def dnscl_record_type(record_type: str, top: int = 0) -> str:
     """Return domain names of a particular record type.
 
     Args:
         record_type (str): Record type to search.
+        top (int, optional): Number of results to return, 0 for all. Defaults to 0.
 
     Returns:
         str: Search results found.
 
     """
-    start_time = timeit.default_timer()
-    record_domain_dict: DefaultDict = defaultdict(int)
-    record_ip_list = []
-    line_count = 0
-    results = ""
-
-    with open(FILENAME, encoding="ISO-8859-1") as syslog:
-        for line in syslog:
-            if "query:" in line:
-                fields = line.strip().split(" ")
-                if record_type.upper() == find_record_type_field(fields):
-                    record_domain = find_domain_field(fields)
-                    record_domain_dict[record_domain] += 1
-                    ip_address = find_ip_field(fields).split("#")
-                    record_ip_list.append(ip_address[0])
-                    line_count += 1
-
-    record_domain_list_sorted = sort_dict(record_domain_dict)
-    elapsed_time = timeit.default_timer() - start_time
-
-    results += f"record type {record_type.upper()} total queries: {line_count}\n"
-    results += "queries: \n"
-
-    for domain_name, query_count in record_domain_list_sorted:
-        results += f"{query_count} \t {domain_name}\n"
-
-    results += "\nip addresses: \n"
-    for ip_addresses_found in set(record_ip_list):
-        results += f"{ip_addresses_found}\n"
-
-    results += f"\nSummary: Searched record type {record_type.upper()} and found "
-    results += f"{line_count} queries for {len(record_domain_dict)} domains from "
-    results += f"{len(set(record_ip_list))} clients.\n"
-    results += f"Query time: {round(elapsed_time, 2)} seconds\n"
-    return results
+    record_domain_dict, record_ip_set, line_count = scan_file(
+        scan_record_type, FILENAME, JOBS, record_type
+    )
+    results: List[str] = []
 
+    record_domain_list_sorted = sort_dict(record_domain_dict, top)
 
-def find_domain_field(fields: List[str]):
-    """Find and return domain field value.
+    results.append(f"record type {record_type.upper()} total queries: {line_count}\n")
+    results.append("queries: \n")
 
-    Args:
-        fields (List[str]): Fields from line.
+    for domain_name, query_count in record_domain_list_sorted:
+        results.append(f"{query_count} \t {domain_name}\n")
 
-    Returns:
-        str: Domain name field value.
+    results.append("\nip addresses: \n")
+    for ip_addresses_found in record_ip_set:
+        results.append(f"{ip_addresses_found.decode(ENCODING)}\n")
 
-    """
-    field_index = 0
-    for field in fields:
-        if field == "query:":
-            field_value = fields[field_index + 1]
-            return field_value
-        field_index += 1
-    return None
+    results.append(f"\nSummary: Searched record type {record_type.upper()} and found ")
+    results.append(f"{line_count} queries for {len(record_domain_dict)} domains from ")
+    results.append(f"{len(record_ip_set)} clients.\n")
+    return "".join(results)
 
 
-def find_ip_field(fields: List[str]):
-    """Find and return IP address field value.
+def scan_file(scan: Callable, filename: str, jobs: int, *args) -> tuple:
+    """Run a syslog scan, only scanning lines added since the last request.
 
     Args:
-        fields (List[str]): Fields from line.
+        scan (Callable): Scan function to run on each chunk of syslog file.
+        filename (str): Path to syslog file.
+        jobs (int): Number of processes to scan with.
+        *args: Search terms passed to scan function.
 
     Returns:
-        str: IP address field value.
+        tuple: Merged results of scan function.
 
     """
-    field_index = 0
-    for field in fields:
-        if field == "query:":
-            field_value = fields[field_index - 2]
-            return field_value
-        field_index += 1
-    return None
+    file_stat = os.stat(filename)
+    if not stat.S_ISREG(file_stat.st_mode):
+        return run_scan(scan, filename, jobs, *args)
+
+    key = (scan, filename, *args)
+    file_id = (file_stat.st_dev, file_stat.st_ino)
+    offset, marker, results = 0, b"", None
+    with scan_cache_lock:
+        state = scan_cache.pop(key, None)
+    if state and state[0] == file_id and state[1] <= file_stat.st_size:
+        # unchanged unless the file was truncated and written again
+        if read_marker(filename, state[1]) == state[2]:
+            offset, marker, results = state[1:]
+
+    # keep a partial last line out of the cache until it is complete
+    end = find_line_end(filename, offset, file_stat.st_size)
+    if results is None or end > offset:
+        new_results = run_scan(scan, filename, jobs, *args, chunk=(offset, end))
+        if results is not None:
+            new_results = merge_results(results, new_results)
+        results = new_results
+        marker = read_marker(filename, end)
+    with scan_cache_lock:
+        scan_cache[key] = (file_id, end, marker, results)
+        while len(scan_cache) > SCAN_CACHE_SIZE:
+            scan_cache.popitem(last=False)
+
+    if end < file_stat.st_size:
+        tail_chunk = (end, file_stat.st_size)
+        tail_results = run_scan(scan, filename, 1, *args, chunk=tail_chunk)
+        return merge_results(results, tail_results)
+    return results
 
 
-def find_rpz_domain_field(fields: List[str]):
-    """Find and return RPZ domain field.
+def find_line_end(filename: str, start: int, end: int) -> int:
+    """Find the end of the last complete line before an offset.
 
     Args:
-        fields (List[str]): Fields from line.
+        filename (str): Path to syslog file.
+        start (int): Offset to search from.
+        end (int): Offset to search to.
 
     Returns:
-        str: RPZ domain name field value.
+        int: Offset after last newline, or start if there is none.
 
     """
-    field_index = 0
-    for field in fields:
-        if field == "QNAME":
-            field_value = fields[field_index + 3]
-            return field_value
-        field_index += 1
-    return None
+    with open(filename, "rb") as syslog:
+        while end > start:
+            block_start = max(end - 65536, start)
+            syslog.seek(block_start)
+            newline = syslog.read(end - block_start).rfind(b"\n")
+            if newline != -1:
+                return block_start + newline + 1
+            end = block_start
+    return start
 
 
-def find_rpz_ip_field(fields: List[str]):
-    """Find and return RPZ IP address field value.
+def read_marker(filename: str, offset: int, size: int = 64) -> bytes:
+    """Read the first bytes and the bytes before an offset to recognize scanned lines.
 
-    Args:
-        fields (List[str]): Fields from line.
-
-    Returns:
-        str: RPZ IP address field value.
-
-    """
-    field_index = 0
-    for field in fields:
-        if field == "QNAME":
-            field_value = fields[field_index - 3]
-            return field_value
-        field_index += 1
-    return None
-
-
-def find_record_type_field(fields: List[str]):
-    """Find and return record type field.
+    Query lines end alike, so the timestamp at the start of the file is
+    kept too, telling apart a file that was truncated and written again.
 
     Args:
-        fields (List[str]): Fields from line.
+        filename (str): Path to syslog file.
+        offset (int): Offset to read up to.
+        size (int, optional): Number of bytes to read at each end. Defaults to 64.
 
     Returns:
-        str: Record type field value.
+        bytes: First bytes of file followed by bytes before offset.
 
     """
-    field_index = 0
-    for field in fields:
-        if field == "query:":
-            field_value = fields[field_index + 3]
-            return field_value
-        field_index += 1
-    return None
+    with open(filename, "rb") as syslog:
+        head = syslog.read(min(offset, size))
+        syslog.seek(max(offset - size, 0))
+        return head + syslog.read(min(offset, size))
 
 
-def sort_dict(dict_unsorted: DefaultDict) -> List:
+def sort_dict(dict_unsorted: Counter, top: int = 0) -> List:
     """Sort dictionary by values in reverse order.
 
     Args:
-        dict_unsorted (DefaultDict): Unsorted search reults.
+        dict_unsorted (Counter): Unsorted search reults with bytes keys.
+        top (int, optional): Number of results to keep, 0 for all. Defaults to 0.
 
     Returns:
-        List: Sorted search results in descending order.
+        List: Sorted search results in descending order with str keys.
 
     """
-    dict_sorted = sorted(
-        dict_unsorted.items(), key=lambda dict_sort: dict_sort[1], reverse=True
-    )
+    dict_sorted = [
+        (key.decode(ENCODING), count)
+        for key, count in dict_unsorted.most_common(top or None)
+    ]
     return dict_sorted
@@ -28,36 +28,58 @@
 
 """This program analyzes Pi-hole DNS queries from log input."""
 import sys
-from collections import defaultdict
+import os
+import stat
+import mmap
+import codecs
+from collections import Counter, OrderedDict
+from itertools import islice
 import timeit
 import socket
 import argparse
-import re
+from dnscl_scan import find_lines, run_scan, text_matcher
 
 __author__ = "Mark W. Hunter"
 __version__ = "0.48-pihole"
 FILENAME = "/var/log/pihole.log"
+JOBS = 1  # number of processes to scan log file with
+QUERY_CACHE_SIZE = 1  # scans to keep, a written log never matches an old id
+query_cache = OrderedDict()  # query counts of recent scans, by log file id
 
 
-def dnscl_ipaddress(ip_address):
+def dnscl_ipaddress(ip_address, tail_hits=0):
     """Returns domain names queried by a client IP address."""
     start_time = timeit.default_timer()
-    domain_dict = defaultdict(int)
-    line_count = 0
-    with open(FILENAME, encoding="UTF-8") as piholelog:
-        for line in piholelog:
-            field_index = 0
-            if "query[" in line:
-                fields = line.strip().split(" ")
-                domain_name_field = find_field(fields, field_index, "domain")
-                if ip_address:
-                    ip_field = find_field(fields, field_index, "ip_address")
-                    if ip_field == ip_address:
-                        domain_dict[domain_name_field] += 1
-                        line_count += 1
-                else:
-                    domain_dict[domain_name_field] += 1
-                    line_count += 1
+    query_counts = query_cache.get(find_file_id())
+    if tail_hits:
+        # the most recent queries are found searching back from end of log
+        search = ip_address.encode("UTF-8") if ip_address else b"query["
+        query_fields = map(find_query_fields, find_last_lines(search))
+        domains = (
+            domain
+            for domain, ip_field in query_fields
+            if domain is not None and (not ip_address or ip_field == ip_address)
+        )
+        domain_dict = Counter(reversed(list(islice(domains, tail_hits))))
+    elif ip_address and query_counts is None:
+        # one client is found faster than by counting all queries
+        lines = find_lines(FILENAME, ip_address.encode("UTF-8"))
+        query_fields = (find_query_fields(line.decode("UTF-8")) for line in lines)
+        domain_dict = Counter(
+            domain for domain, ip_field in query_fields if ip_field == ip_address
+        )
+    else:
+        if query_counts is None:
+            query_counts = scan_queries()
+        domain_dict = Counter()
+        if ip_address:
+            for (domain, ip_field), query_count in query_counts.items():
+                if ip_field == ip_address:
+                    domain_dict[domain] += query_count
+        else:
+            for (domain, _), query_count in query_counts.items():
+                domain_dict[domain] += query_count
+    line_count = sum(domain_dict.values())
 
     domain_list_sorted = sort_dict(domain_dict)
     elapsed_time = timeit.default_timer() - start_time
@@ -65,8 +87,10 @@ def dnscl_ipaddress(ip_address):
     print(f"{ip_address} total queries: {line_count}")
     print("queries: ")
 
-    for domain_name, query_count in domain_list_sorted:
-        print(f"{query_count}\t {domain_name}")
+    print_lines(
+        f"{query_count}\t {domain_name}"
+        for domain_name, query_count in domain_list_sorted
+    )
 
     print(
         f"\nSummary: Searched {ip_address} and found {line_count}",
@@ -78,22 +102,20 @@ def dnscl_ipaddress(ip_address):
 def dnscl_domain(domain_name):
     """Returns client IP addresses that queried a domain name."""
     start_time = timeit.default_timer()
-    ip_dict = defaultdict(int)
-    domain_list = []
-    line_count = 0
-
-    with open(FILENAME, encoding="UTF-8") as piholelog:
-        for line in piholelog:
-            field_index = 0
-            if "query[" in line:
-                fields = line.strip().split(" ")
-                domain_name_field = find_field(fields, field_index, "domain")
-                ip_address = find_field(fields, field_index, "ip_address")
-                if re.search(domain_name, domain_name_field, re.IGNORECASE):
-                    ip_dict[ip_address] += 1
-                    if domain_name:
-                        domain_list.append(domain_name_field)
-                    line_count += 1
+    ip_dict = Counter()
+    domain_set = set()
+    query_counts = scan_queries()
+
+    if domain_name:
+        domain_match = text_matcher(domain_name)
+        for (domain_name_field, ip_address), query_count in query_counts.items():
+            if domain_match(domain_name_field):
+                ip_dict[ip_address] += query_count
+                domain_set.add(domain_name_field)
+    else:
+        for (_, ip_address), query_count in query_counts.items():
+            ip_dict[ip_address] += query_count
+    line_count = sum(ip_dict.values())
 
     ip_list_sorted = sort_dict(ip_dict)
     elapsed_time = timeit.default_timer() - start_time
@@ -101,16 +123,16 @@ def dnscl_domain(domain_name):
     print(f"{domain_name} total queries: {line_count}")
     print("ip addresses: ")
 
-    for ip_address, query_count in ip_list_sorted:
-        print(f"{query_count}\t {ip_address}")
+    print_lines(
+        f"{query_count}\t {ip_address}" for ip_address, query_count in ip_list_sorted
+    )
 
     if domain_name:
         print("\ndomain names: ")
-        for domain_names_found in sorted(set(domain_list)):
-            print(domain_names_found)
+        print_lines(sorted(domain_set))
         print(
             f"\nSummary: Searched {domain_name} and found {line_count}",
-            f"queries for {len(set(domain_list))} domain names from {len(ip_dict)} clients.",
+            f"queries for {len(domain_set)} domain names from {len(ip_dict)} clients.",
         )
     else:
         print(
@@ -123,18 +145,8 @@ def dnscl_domain(domain_name):
 def dnscl_blocklist(block_list_name):
     """Returns blocklist names queried by a client IP address."""
     start_time = timeit.default_timer()
-    block_list_dict = defaultdict(int)
-    line_count = 0
-
-    with open(FILENAME, encoding="UTF-8") as piholelog:
-        for line in piholelog:
-            field_index = 0
-            if block_list_name in line:
-                if "is 0.0.0.0" in line:
-                    fields = line.strip().split(" ")
-                    block_list_field = find_field(fields, field_index, "block_domain")
-                    block_list_dict[block_list_field] += 1
-                    line_count += 1
+    block_list_dict = run_scan(count_blocked, FILENAME, JOBS, block_list_name)
+    line_count = sum(block_list_dict.values())
 
     block_list_sorted = sort_dict(block_list_dict)
     elapsed_time = timeit.default_timer() - start_time
@@ -142,8 +154,10 @@ def dnscl_blocklist(block_list_name):
     print(f"{block_list_name} total queries: {line_count}")
     print("queries: ")
 
-    for domain_name, query_count in block_list_sorted:
-        print(f"{query_count}\t {domain_name}")
+    print_lines(
+        f"{query_count}\t {domain_name}"
+        for domain_name, query_count in block_list_sorted
+    )
 
     print(
         f"\nSummary: Searched {block_list_name} and found {line_count}",
@@ -152,55 +166,152 @@ def dnscl_blocklist(block_list_name):
     print(f"Query time: {round(elapsed_time, 2)} seconds")
 
 
-def is_valid_ipv4_address(address):
-    """Checks input is a valid IPv4 address."""
+def is_valid_ip_address(address):
+    """Checks input is a valid IPv4 or IPv6 address."""
+    # only IPv6 addresses contain a colon, no need to try both families
+    family = socket.AF_INET6 if ":" in address else socket.AF_INET
     try:
-        socket.inet_pton(socket.AF_INET, address)
+        socket.inet_pton(family, address)
     except socket.error:
         return False
     return True
 
 
-def is_valid_ipv6_address(address):
-    """Checks input is a valid IPv6 address."""
-    try:
-        socket.inet_pton(socket.AF_INET6, address)
-    except socket.error:
-        return False
-    return True
+def scan_queries():
+    """Returns query counts per domain name and client IP address."""
+    file_id = find_file_id()
+    if file_id in query_cache:
+        return query_cache[file_id]
+    query_counts = run_scan(count_queries, FILENAME, JOBS)
+    if file_id is not None:
+        query_cache[file_id] = query_counts
+        while len(query_cache) > QUERY_CACHE_SIZE:
+            query_cache.popitem(last=False)
+    return query_counts
+
+
+def count_queries(filename, chunk):
+    """Returns query counts per domain name and client IP address of a chunk."""
+    lines = read_lines(filename, "query[", *chunk)
+    query_counts = Counter(map(find_query_fields, lines))
+    query_counts.pop((None, None), None)  # lines too short to hold both fields
+    return query_counts
+
+
+def count_blocked(filename, chunk, block_list_name):
+    """Returns query counts per blocked domain name of a chunk."""
+    return Counter(
+        find_block_field(line)
+        for line in read_lines(filename, block_list_name, *chunk)
+        if "is 0.0.0.0" in line
+    )
+
+
+def find_file_id():
+    """Returns id that changes when log file is written, None for pipes."""
+    file_stat = os.stat(FILENAME)
+    if not stat.S_ISREG(file_stat.st_mode):
+        return None
+    return (
+        FILENAME,
+        file_stat.st_dev,
+        file_stat.st_ino,
+        file_stat.st_mtime_ns,
+        file_stat.st_size,
+    )
 
 
-def find_field(fields, field_index, field_type):
-    """Find and return requested field value."""
-    if field_type == "domain":
-        for field in fields:
-            if "query[" in field:
-                field_value = fields[field_index + 1]
-                return field_value
-            field_index += 1
-    elif field_type == "ip_address":
-        for field in fields:
-            if "query[" in field:
-                field_value = fields[field_index + 3]
-                return field_value
-            field_index += 1
-    elif field_type == "block_domain":
-        for field in fields:
-            if "0.0.0.0" in field:
-                field_value = fields[field_index - 2]
-                return field_value
-            field_index += 1
-    return None
+def read_lines(filename, search, start=0, end=None):
+    """Yields log lines containing a common search term."""
+    if end is None:
+        with open(filename, encoding="UTF-8") as piholelog:
+            for line in piholelog:
+                if search in line:
+                    yield line
+        return
+
+    # text files cannot stop reading at an offset, decode the chunk in blocks
+    decoder = codecs.getincrementaldecoder("UTF-8")()
+    partial_line = ""
+    with open(filename, "rb") as piholelog:
+        piholelog.seek(start)
+        while start < end:
+            block = piholelog.read(min(65536, end - start))
+            if not block:
+                break
+            start += len(block)
+            lines = (partial_line + decoder.decode(block)).split("\n")
+            partial_line = lines.pop()
+            for line in lines:
+                if search in line:
+                    yield line
+    partial_line += decoder.decode(b"", final=True)
+    if partial_line and search in partial_line:
+        yield partial_line
+
+
+def find_last_lines(search):
+    """Yields decoded log lines containing a search term, last line first."""
+    with open(FILENAME, "rb") as piholelog:
+        try:
+            piholelog_map = mmap.mmap(piholelog.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError):
+            # empty files and pipes cannot be memory-mapped
+            lines = [line for line in piholelog if search in line]
+            for line in reversed(lines):
+                yield line.rstrip(b"\n").decode("UTF-8")
+            return
+        with piholelog_map:
+            position = piholelog_map.rfind(search)
+            while position != -1:
+                line_start = piholelog_map.rfind(b"\n", 0, position) + 1
+                line_end = piholelog_map.find(b"\n", position)
+                if line_end == -1:
+                    line_end = len(piholelog_map)
+                yield piholelog_map[line_start:line_end].decode("UTF-8")
+                position = piholelog_map.rfind(search, 0, line_start)
+
+
+def find_query_fields(line):
+    """Find and return domain name and client IP address of a query line."""
+    fields = line.partition("query[")[2].rstrip().split(" ", 4)
+    if len(fields) < 4:
+        return None, None
+    return fields[1], fields[3]
+
+
+def find_block_field(line):
+    """Find and return blocked domain name of a blocklist line."""
+    return line.partition(" is 0.0.0.0")[0].rpartition(" ")[2]
+
+
+def tail_count(value):
+    """Returns number of recent queries to search, rejecting negative numbers."""
+    try:
+        tail_hits = int(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid int value: '{value}'") from None
+    if tail_hits < 0:
+        raise argparse.ArgumentTypeError("must not be negative")
+    return tail_hits
 
 
 def sort_dict(dict_unsorted):
     """Sort dictionary by values in reverse order."""
-    dict_sorted = sorted(
-        dict_unsorted.items(), key=lambda dict_sort: dict_sort[1], reverse=True
-    )
+    dict_sorted = dict_unsorted.most_common()
     return dict_sorted
 
 
+def print_lines(lines):
+    """Prints lines with a single write."""
+    lines = list(lines)
+    lines.append("")  # end last line with a newline
+    try:
+        sys.stdout.write("\n".join(lines))
+    except BrokenPipeError:
+        sys.exit(1)
+
+
 def menu():
     """Prints main menu."""
     print("\ndnscl Menu (Pi-hole version)\n")
@@ -227,12 +338,14 @@ if __name__ == "__main__":
             if int(CHOICE) == 1:
                 IP = input("ip address: ")
                 if IP:
-                    while not is_valid_ipv4_address(IP) and not is_valid_ipv6_address(
-                        IP
-                    ):
+                    while not is_valid_ip_address(IP):
                         print("Invalid ip address, try again.")
                         IP = input("ip address: ")
-                dnscl_ipaddress(IP)
+                TAIL = input("recent queries to search (blank for all): ")
+                while TAIL and not TAIL.isdecimal():
+                    print("Invalid number, try again.")
+                    TAIL = input("recent queries to search (blank for all): ")
+                dnscl_ipaddress(IP, int(TAIL or 0))
             elif int(CHOICE) == 2:
                 DOMAIN = input("domain name: ")
                 dnscl_domain(DOMAIN)
@@ -259,8 +372,19 @@ if __name__ == "__main__":
             "blocklist", help="blocklist domains queried"
         )
         parser_ip.add_argument("-i", help="ip address", default=WILDCARD)
+        parser_ip.add_argument(
+            "-t",
+            "--tail",
+            help="number of recent queries to search",
+            type=tail_count,
+            default=0,
+        )
         parser_domain.add_argument("-d", help="domain", default=WILDCARD)
         parser_blocklist.add_argument("-b", help="blocklist name", default=WILDCARD)
+        for parser_command in (parser_ip, parser_domain, parser_blocklist):
+            parser_command.add_argument(
+                "-j", "--jobs", help="number of processes", type=int, default=JOBS
+            )
         dnscl_parser.add_argument(
             "-v",
             "--version",
@@ -268,15 +392,16 @@ if __name__ == "__main__":
             version="%(prog)s " + __version__ + ", " + __author__ + " (c) 2020",
         )
         args = dnscl_parser.parse_args()
+        JOBS = getattr(args, "jobs", JOBS)
 
         if args.command == "ip":
             if args.i:
-                if is_valid_ipv4_address(args.i) or is_valid_ipv6_address(args.i):
-                    dnscl_ipaddress(args.i)
+                if is_valid_ip_address(args.i):
+                    dnscl_ipaddress(args.i, args.tail)
                 else:
                     print("Invalid ip address, try again.")
             else:
-                dnscl_ipaddress(args.i)
+                dnscl_ipaddress(args.i, args.tail)
         elif args.command == "domain":
             dnscl_domain(args.d)
         elif args.command == "blocklist":
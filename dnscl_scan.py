@@ -0,0 +1,546 @@
+# dnscl: Analyze BIND DNS query data from syslog file input - scan engine
+# author: Mark W. Hunter
+# https://github.com/mark-w-hunter/dnscl
+#
+# The MIT License (MIT)
+#
+# Copyright (c) 2021 Mark W. Hunter
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+"""Scan BIND DNS queries from syslog input for the dnscl scripts."""
+import os
+import mmap
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from functools import reduce
+from itertools import repeat
+import re
+from typing import Any, Callable, Iterator, List, Optional, Set, Tuple
+
+ENCODING = "ISO-8859-1"  # syslog file encoding
+# translation table to lower case bytes like str.lower()
+LOWER_CASE = bytes(range(256)).decode(ENCODING).lower().encode(ENCODING)
+
+Chunk = Tuple[int, Optional[int]]  # start and end offset of syslog file
+
+
+def scan_ipaddress(
+    filename: str, chunk: Chunk, ip_address: str, domain_search: str
+) -> Tuple[Counter, int]:
+    """Scan syslog for domain names queried by a client IP address.
+
+    Args:
+        filename (str): Path to syslog file.
+        chunk (Chunk): Start and end offset of syslog file to scan.
+        ip_address (str): IP address to search.
+        domain_search (str): Domain name to search.
+
+    Returns:
+        Tuple[Counter, int]: Queries per domain name and number of queries found.
+
+    """
+    domain_dict: Counter = Counter()
+    line_count = 0
+    ip_address_search = encode_search(ip_address + "#")
+    if ip_address_search is None:
+        return domain_dict, line_count
+    search = ip_address_search if ip_address else b"query:"
+    domain_match = search_matcher(domain_search)
+
+    for line in find_lines(filename, search, *chunk):
+        if b"query:" in line and ip_address_search in line and b"named" in line:
+            fields = line.split(b" ")
+            if len(fields) > 12:
+                domain = find_domain_field(fields)
+                if not domain_search or domain_match(domain):
+                    domain_dict[domain] += 1
+                    line_count += 1
+    return domain_dict, line_count
+
+
+def scan_domain(
+    filename: str, chunk: Chunk, domain_name: str, ip_search: str
+) -> Tuple[Counter, Counter, int]:
+    """Scan syslog for client IP addresses that queried a domain name.
+
+    Args:
+        filename (str): Path to syslog file.
+        chunk (Chunk): Start and end offset of syslog file to scan.
+        domain_name (str): Domain name to search.
+        ip_search (str): IP address to search.
+
+    Returns:
+        Tuple[Counter, Counter, int]: Queries per IP address, queries per
+            domain name and number of queries found.
+
+    """
+    ip_dict: Counter = Counter()
+    domain_dict: Counter = Counter()
+    line_count = 0
+    search = encode_search(ip_search) if ip_search else b"query:"
+    if search is None:
+        return ip_dict, domain_dict, line_count
+    domain_match = search_matcher(domain_name)
+
+    for line in find_lines(filename, search, *chunk):
+        if b"query:" in line:
+            fields = line.split(b" ")
+            domain_name_field = find_domain_field(fields)
+            if domain_match(domain_name_field):
+                ip_address_field = find_ip_field(fields).split(b"#")
+                ip_address = ip_address_field[0]
+                ip_dict[ip_address] += 1
+                domain_dict[domain_name_field] += 1
+                line_count += 1
+    return ip_dict, domain_dict, line_count
+
+
+def scan_rpz(filename: str, chunk: Chunk, ip_address: str) -> Tuple[Counter, int]:
+    """Scan syslog for RPZ names queried by a client IP address.
+
+    Args:
+        filename (str): Path to syslog file.
+        chunk (Chunk): Start and end offset of syslog file to scan.
+        ip_address (str): IP address to search.
+
+    Returns:
+        Tuple[Counter, int]: Queries per RPZ name and number of queries found.
+
+    """
+    rpz_dict: Counter = Counter()
+    line_count = 0
+    ip_address_search = encode_search(ip_address + "#")
+    if ip_address_search is None:
+        return rpz_dict, line_count
+    search = ip_address_search if ip_address else b"QNAME"
+
+    for line in find_lines(filename, search, *chunk):
+        if b"QNAME" in line and ip_address_search in line and b"SOA" not in line:
+            fields = line.split(b" ")
+            if len(fields) > 11:
+                rpz_domain_fields = find_rpz_domain_field(fields).split(b"/")
+                rpz_domain = rpz_domain_fields[0]
+                rpz_dict[rpz_domain] += 1
+                line_count += 1
+    return rpz_dict, line_count
+
+
+def scan_rpz_domain(
+    filename: str, chunk: Chunk, domain_rpz_name: str
+) -> Tuple[Counter, Set[bytes], int]:
+    """Scan syslog for client IP addresses that queried a RPZ domain name.
+
+    Args:
+        filename (str): Path to syslog file.
+        chunk (Chunk): Start and end offset of syslog file to scan.
+        domain_rpz_name (str): RPZ domain name to search.
+
+    Returns:
+        Tuple[Counter, Set[bytes], int]: Queries per IP address, RPZ names found
+            and number of queries found.
+
+    """
+    rpz_ip_dict: Counter = Counter()
+    rpz_domain_set: Set[bytes] = set()
+    line_count = 0
+    domain_rpz_search = encode_search(domain_rpz_name)
+    if domain_rpz_search is None:
+        return rpz_ip_dict, rpz_domain_set, line_count
+    search = domain_rpz_search if domain_rpz_name else b"QNAME"
+
+    for line in find_lines(filename, search, *chunk):
+        if b"QNAME" in line and b"SOA" not in line:
+            fields = line.split(b" ")
+            if len(fields) > 11:
+                ip_address_field = find_rpz_ip_field(fields).split(b"#")
+                ip_address = ip_address_field[0]
+                rpz_domain_fields = find_rpz_domain_field(fields).split(b"/")
+                rpz_domain = rpz_domain_fields[0]
+                rpz_ip_dict[ip_address] += 1
+                if domain_rpz_name:
+                    rpz_domain_set.add(rpz_domain)
+                line_count += 1
+    return rpz_ip_dict, rpz_domain_set, line_count
+
+
+def scan_record_ip(
+    filename: str, chunk: Chunk, ip_address: str
+) -> Tuple[Counter, Set[bytes], int]:
+    """Scan syslog for record types queried by a client IP address.
+
+    Args:
+        filename (str): Path to syslog file.
+        chunk (Chunk): Start and end offset of syslog file to scan.
+        ip_address (str): IP address to search.
+
+    Returns:
+        Tuple[Counter, Set[bytes], int]: Queries per record type, domain names
+            found and number of queries found.
+
+    """
+    record_dict: Counter = Counter()
+    domain_set: Set[bytes] = set()
+    line_count = 0
+    ip_address_search = encode_search(ip_address + "#")
+    if ip_address_search is None:
+        return record_dict, domain_set, line_count
+    search = ip_address_search if ip_address else b"query:"
+
+    for line in find_lines(filename, search, *chunk):
+        if b"query:" in line and ip_address_search in line:
+            fields = line.split(b" ")
+            if len(fields) > 12:
+                record_type = find_record_type_field(fields)
+                record_dict[record_type] += 1
+                domain_set.add(find_domain_field(fields))
+                line_count += 1
+    return record_dict, domain_set, line_count
+
+
+def scan_record_domain(
+    filename: str, chunk: Chunk, domain_name: str
+) -> Tuple[Counter, Set[bytes], Set[bytes], int]:
+    """Scan syslog for record types of a queried domain name.
+
+    Args:
+        filename (str): Path to syslog file.
+        chunk (Chunk): Start and end offset of syslog file to scan.
+        domain_name (str): Domain name to search.
+
+    Returns:
+        Tuple[Counter, Set[bytes], Set[bytes], int]: Queries per record type, IP
+            addresses found, domain names found and number of queries found.
+
+    """
+    record_dict: Counter = Counter()
+    ip_set: Set[bytes] = set()
+    domain_set: Set[bytes] = set()
+    line_count = 0
+    domain_search = encode_search(domain_name.lower())
+    if domain_search is None:
+        return record_dict, ip_set, domain_set, line_count
+
+    for line in find_lines(filename, b"query:", *chunk):
+        if domain_search in line.translate(LOWER_CASE):
+            fields = line.split(b" ")
+            ip_address = find_ip_field(fields).split(b"#")
+            ip_set.add(ip_address[0])
+            record_type = find_record_type_field(fields)
+            record_dict[record_type] += 1
+            if domain_name:
+                domain_set.add(find_domain_field(fields))
+            line_count += 1
+    return record_dict, ip_set, domain_set, line_count
+
+
+def scan_record_type(
+    filename: str, chunk: Chunk, record_type: str
+) -> Tuple[Counter, Set[bytes], int]:
+    """Scan syslog for domain names of a particular record type.
+
+    Args:
+        filename (str): Path to syslog file.
+        chunk (Chunk): Start and end offset of syslog file to scan.
+        record_type (str): Record type to search.
+
+    Returns:
+        Tuple[Counter, Set[bytes], int]: Queries per domain name, IP addresses
+            found and number of queries found.
+
+    """
+    record_domain_dict: Counter = Counter()
+    record_ip_set: Set[bytes] = set()
+    line_count = 0
+    record_search = encode_search(record_type.upper())
+    if record_search is None:
+        return record_domain_dict, record_ip_set, line_count
+
+    for line in find_lines(filename, b"query:", *chunk):
+        fields = line.split(b" ")
+        if record_search == find_record_type_field(fields):
+            record_domain = find_domain_field(fields)
+            record_domain_dict[record_domain] += 1
+            ip_address = find_ip_field(fields).split(b"#")
+            record_ip_set.add(ip_address[0])
+            line_count += 1
+    return record_domain_dict, record_ip_set, line_count
+
+
+def run_scan(
+    scan: Callable, filename: str, jobs: int, *args, chunk: Chunk = (0, None)
+) -> Any:
+    """Run a syslog scan, split across worker processes.
+
+    Args:
+        scan (Callable): Scan function to run on each chunk of syslog file.
+        filename (str): Path to syslog file.
+        jobs (int): Number of processes to scan with.
+        *args: Search terms passed to scan function.
+        chunk (Chunk, optional): Start and end offset of syslog file to scan.
+            Defaults to (0, None), the whole file.
+
+    Returns:
+        Any: Merged results of scan function.
+
+    """
+    chunks = split_file(filename, jobs, *chunk)
+    if len(chunks) == 1:
+        return scan(filename, chunks[0], *args)
+
+    with ProcessPoolExecutor(len(chunks)) as executor:
+        results = executor.map(
+            scan, repeat(filename), chunks, *(repeat(arg) for arg in args)
+        )
+        return reduce(merge_results, results)
+
+
+def split_file(
+    filename: str, jobs: int, start: int = 0, end: Optional[int] = None
+) -> List[Chunk]:
+    """Split syslog file into chunks that start at a line boundary.
+
+    Args:
+        filename (str): Path to syslog file.
+        jobs (int): Number of chunks to split into.
+        start (int, optional): Offset to start splitting at, must be at a line
+            boundary. Defaults to 0.
+        end (Optional[int], optional): Offset to stop splitting at. Defaults
+            to None, the end of file.
+
+    Returns:
+        List[Chunk]: Start and end offset of each chunk.
+
+    """
+    file_size = os.path.getsize(filename) if end is None else end
+    if jobs < 2 or file_size <= start:  # pipes report a size of zero
+        return [(start, end)]
+
+    offsets = [start]
+    span = file_size - start
+    with open(filename, "rb") as syslog:
+        for job in range(1, jobs):
+            syslog.seek(max(start + span * job // jobs - 1, offsets[-1]))
+            syslog.readline()
+            offsets.append(min(syslog.tell(), file_size))
+    offsets.append(file_size)
+    return [(first, last) for first, last in zip(offsets, offsets[1:]) if first < last]
+
+
+def merge_results(results: Any, other_results: Any) -> Any:
+    """Merge results of two syslog scans.
+
+    Args:
+        results (Any): Results of scan function.
+        other_results (Any): Results of scan function.
+
+    Returns:
+        Any: Counters and counts added, sets combined, tuples merged item by item.
+
+    """
+    if isinstance(results, tuple):
+        return tuple(map(merge_results, results, other_results))
+    if isinstance(results, set):
+        return results | other_results
+    return results + other_results
+
+
+def find_lines(
+    filename: str, search: bytes, start: int = 0, end: Optional[int] = None
+) -> Iterator[bytes]:
+    """Find and return lines containing a search term.
+
+    Args:
+        filename (str): Path to syslog file.
+        search (bytes): Term to search, must not be empty.
+        start (int, optional): Offset to start searching at. Defaults to 0.
+        end (Optional[int], optional): Offset to stop searching at. Defaults
+            to None, the end of file.
+
+    Yields:
+        bytes: Line containing search term, without trailing newline.
+
+    """
+    with open(filename, "rb") as syslog:
+        try:
+            syslog_map = mmap.mmap(syslog.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError):
+            # empty files and pipes cannot be memory-mapped
+            for line in syslog:
+                if search in line:
+                    yield line.rstrip(b"\n")
+            return
+        with syslog_map:
+            # hint the kernel to read ahead, lines are scanned front to back
+            if hasattr(os, "posix_fadvise"):
+                os.posix_fadvise(syslog.fileno(), 0, 0, os.POSIX_FADV_SEQUENTIAL)
+            if hasattr(mmap, "MADV_SEQUENTIAL"):
+                syslog_map.madvise(mmap.MADV_SEQUENTIAL)
+            if end is None:
+                end = len(syslog_map)
+            position = syslog_map.find(search, start, end)
+            while position != -1:
+                line_start = syslog_map.rfind(b"\n", 0, position) + 1
+                line_end = syslog_map.find(b"\n", position)
+                if line_end == -1:
+                    line_end = len(syslog_map)
+                yield syslog_map[line_start:line_end]
+                position = syslog_map.find(search, line_end, end)
+
+
+def search_matcher(search: str) -> Callable:
+    """Compile a case-insensitive search term.
+
+    Args:
+        search (str): Regular expression or plain text to search.
+
+    Returns:
+        Callable: Function that returns a true value if its bytes argument matches.
+
+    """
+    if re.escape(search) == search:
+        search_lower = encode_search(search.lower())
+        if search_lower is None:
+            return lambda value: False
+        return lambda value: search_lower in value.translate(LOWER_CASE)
+    search_regex = re.compile(search, re.IGNORECASE)
+    return lambda value: search_regex.search(value.decode(ENCODING))
+
+
+def text_matcher(search: str) -> Callable:
+    """Compile a case-insensitive search term for decoded lines.
+
+    Args:
+        search (str): Regular expression or plain text to search.
+
+    Returns:
+        Callable: Function that returns a true value if its str argument matches.
+
+    """
+    if re.escape(search) == search:
+        search_lower = search.lower()
+        return lambda value: search_lower in value.lower()
+    return re.compile(search, re.IGNORECASE).search
+
+
+def encode_search(search: str) -> Optional[bytes]:
+    """Encode a search term to match syslog file lines.
+
+    Args:
+        search (str): Term to search.
+
+    Returns:
+        Optional[bytes]: Search term encoded as in syslog file, None if it has
+            characters the file cannot contain and so matches no line.
+
+    """
+    try:
+        return search.encode(ENCODING)
+    except UnicodeEncodeError:
+        return None
+
+
+def find_domain_field(fields: List[bytes]):
+    """Find and return domain field value.
+
+    Args:
+        fields (List[bytes]): Fields from line.
+
+    Returns:
+        bytes: Domain name field value.
+
+    """
+    try:
+        field_index = fields.index(b"query:")
+    except ValueError:
+        return None
+    field_value = fields[field_index + 1]
+    return field_value
+
+
+def find_ip_field(fields: List[bytes]):
+    """Find and return IP address field value.
+
+    Args:
+        fields (List[bytes]): Fields from line.
+
+    Returns:
+        bytes: IP address field value.
+
+    """
+    try:
+        field_index = fields.index(b"query:")
+    except ValueError:
+        return None
+    field_value = fields[field_index - 2]
+    return field_value
+
+
+def find_rpz_domain_field(fields: List[bytes]):
+    """Find and return RPZ domain field.
+
+    Args:
+        fields (List[bytes]): Fields from line.
+
+    Returns:
+        bytes: RPZ domain name field value.
+
+    """
+    try:
+        field_index = fields.index(b"QNAME")
+    except ValueError:
+        return None
+    field_value = fields[field_index + 3]
+    return field_value
+
+
+def find_rpz_ip_field(fields: List[bytes]):
+    """Find and return RPZ IP address field value.
+
+    Args:
+        fields (List[bytes]): Fields from line.
+
+    Returns:
+        bytes: RPZ IP address field value.
+
+    """
+    try:
+        field_index = fields.index(b"QNAME")
+    except ValueError:
+        return None
+    field_value = fields[field_index - 3]
+    return field_value
+
+
+def find_record_type_field(fields: List[bytes]):
+    """Find and return record type field.
+
+    Args:
+        fields (List[bytes]): Fields from line.
+
+    Returns:
+        bytes: Record type field value.
+
+    """
+    try:
+        field_index = fields.index(b"query:")
+    except ValueError:
+        return None
+    field_value = fields[field_index + 3]
+    return field_value
@@ -28,12 +28,12 @@
 
 """This program analyzes BIND DNS queries from syslog input."""
 import sys
+import mmap
 import timeit
-from collections import defaultdict
-import re
+from collections import Counter, deque
 import argparse
-import subprocess
-from typing import DefaultDict, List
+from typing import Iterable, List, Optional, Set, Tuple
+from dnscl_scan import text_matcher
 
 __author__ = "Mark W. Hunter"
 __version__ = "0.58-tail"
@@ -47,40 +47,39 @@ def dnscl_ipaddress(
     domain_search: str = "",
     tail_num: int = 0,
     quiet_mode: bool = False,
+    top: int = 0,
 ) -> int:
     """Return a domain name queried by a client IP address."""
     start_time = timeit.default_timer()
-    domain_dict: DefaultDict = defaultdict(int)
-    line_count = 0
-    ip_address_search = ip_address + "#"
+    ip_address_search = (ip_address + "#").encode()
+    domain_match = text_matcher(domain_search)
 
     if tail_num:
         syslog = tail(filename, tail_num)
     else:
         syslog = tail(filename)
 
-    for line in syslog:
-        line = line.decode("utf-8")
-        if ip_address_search in line and "named" in line and "query" in line:
-            fields = line.strip().split(" ")
-            if len(fields) > 12:
-                domain = find_domain_field(fields)
-                if domain_search:
-                    if re.search(domain_search, domain, re.IGNORECASE):
-                        domain_dict[domain] += 1
-                        line_count += 1
-                else:
-                    domain_dict[domain] += 1
-                    line_count += 1
+    query_fields = (
+        find_query_fields(line.decode("utf-8"))
+        for line in syslog
+        if ip_address_search in line and b"named" in line and b"query" in line
+    )
+    domains = (domain for _, domain, _ in query_fields if domain is not None)
+    if domain_search:
+        domains = (domain for domain in domains if domain_match(domain))
+    domain_dict: Counter = Counter(domains)
+    line_count = sum(domain_dict.values())
 
-    domain_list_sorted = sort_dict(domain_dict)
+    domain_list_sorted = sort_dict(domain_dict, top)
     elapsed_time = timeit.default_timer() - start_time
 
     print(f"{ip_address} total queries: {line_count}")
     print("queries: ")
 
-    for domain_name, query_count in domain_list_sorted:
-        print(f"{query_count} \t {domain_name}")
+    print_lines(
+        f"{query_count} \t {domain_name}"
+        for domain_name, query_count in domain_list_sorted
+    )
 
     if not quiet_mode:
         print(
@@ -97,12 +96,15 @@ def dnscl_domain(
     ip_search: str = "",
     tail_num: int = 0,
     quiet_mode: bool = False,
+    top: int = 0,
 ) -> int:
     """Return client IP addresses that queried a domain name."""
     start_time = timeit.default_timer()
-    ip_dict: DefaultDict = defaultdict(int)
-    domain_list = []
+    ip_dict: Counter = Counter()
+    domain_set: Set[str] = set()
     line_count = 0
+    domain_match = text_matcher(domain_name)
+    ip_search_bytes = ip_search.encode()
 
     if tail_num:
         syslog = tail(filename, tail_num)
@@ -110,37 +112,29 @@ def dnscl_domain(
         syslog = tail(filename)
 
     for line in syslog:
-        line = line.decode("utf-8")
-        if "query:" in line:
-            fields = line.strip().split(" ")
-            ip_address_field = find_ip_field(fields).split("#")
-            ip_address = ip_address_field[0]
-            domain_name_field = find_domain_field(fields)
-            if re.search(domain_name, domain_name_field, re.IGNORECASE):
-                if ip_search:
-                    if ip_search in line:
-                        ip_dict[ip_address] += 1
-                        domain_list.append(domain_name_field)
-                        line_count += 1
-                else:
-                    ip_dict[ip_address] += 1
-                    domain_list.append(domain_name_field)
-                    line_count += 1
+        # an empty ip search is found in every line
+        if ip_search_bytes in line and b"query:" in line:
+            text = line.decode("utf-8")
+            ip_address, domain_name_field, _ = find_query_fields(text)
+            if domain_name_field is not None and domain_match(domain_name_field):
+                ip_dict[ip_address] += 1
+                domain_set.add(domain_name_field)
+                line_count += 1
 
-    ip_list_sorted = sort_dict(ip_dict)
-    domain_set = sorted(set(domain_list))
+    ip_list_sorted = sort_dict(ip_dict, top)
+    domain_list_sorted = sorted(domain_set)
     elapsed_time = timeit.default_timer() - start_time
 
     print(f"{domain_name} total queries: {line_count}")
     print("ip addresses: ")
 
-    for ip_address, query_count in ip_list_sorted:
-        print(f"{query_count} \t {ip_address}")
+    print_lines(
+        f"{query_count} \t {ip_address}" for ip_address, query_count in ip_list_sorted
+    )
 
     if domain_name:
         print("\ndomain names: ")
-        for domain_names_found in domain_set:
-            print(domain_names_found)
+        print_lines(domain_list_sorted)
         if not quiet_mode:
             print(
                 f"\nSummary: Searched {domain_name} and found {line_count}",
@@ -162,37 +156,39 @@ def dnscl_rpz(
     filename: str = FILENAME,
     tail_num: int = 0,
     quiet_mode: bool = False,
+    top: int = 0,
 ) -> int:
     """Return rpz names queried by a client IP address."""
     start_time = timeit.default_timer()
-    rpz_dict: DefaultDict = defaultdict(int)
-    line_count = 0
-    ip_address_search = ip_address + "#"
+    ip_address_search = (ip_address + "#").encode()
 
     if tail_num:
         syslog = tail(filename, tail_num)
     else:
         syslog = tail(filename)
 
-    for line in syslog:
-        line = line.decode("utf-8")
-        if ip_address_search in line:
-            if "QNAME" in line and "SOA" not in line:
-                fields = line.strip().split(" ")
-                rpz_domain_fields = find_rpz_domain_field(fields).split("/")
-                rpz_domain = rpz_domain_fields[0]
-                if len(fields) > 11:
-                    rpz_dict[rpz_domain] += 1
-                    line_count += 1
+    rpz_fields = (
+        line.decode("utf-8").split(" ")
+        for line in syslog
+        if ip_address_search in line and b"QNAME" in line and b"SOA" not in line
+    )
+    rpz_dict: Counter = Counter(
+        find_rpz_domain_field(fields).split("/")[0]
+        for fields in rpz_fields
+        if len(fields) > 11
+    )
+    line_count = sum(rpz_dict.values())
 
-    rpz_list_sorted = sort_dict(rpz_dict)
+    rpz_list_sorted = sort_dict(rpz_dict, top)
     elapsed_time = timeit.default_timer() - start_time
 
     print(f"{ip_address} total queries: {line_count}")
     print("queries: ")
 
-    for domain_name, query_count in rpz_list_sorted:
-        print(query_count, "\t", domain_name)
+    print_lines(
+        f"{query_count} \t {domain_name}"
+        for domain_name, query_count in rpz_list_sorted
+    )
 
     if not quiet_mode:
         print(
@@ -208,12 +204,14 @@ def dnscl_rpz_domain(
     filename: str = FILENAME,
     tail_num: int = 0,
     quiet_mode: bool = False,
+    top: int = 0,
 ) -> int:
     """Return client IP addresses that queried a rpz domain name."""
     start_time = timeit.default_timer()
-    rpz_ip_dict: DefaultDict = defaultdict(int)
-    rpz_domain_list = []
+    rpz_ip_dict: Counter = Counter()
+    rpz_domain_set: Set[str] = set()
     line_count = 0
+    domain_rpz_search = domain_rpz_name.encode()
 
     if tail_num:
         syslog = tail(filename, tail_num)
@@ -221,35 +219,36 @@ def dnscl_rpz_domain(
         syslog = tail(filename)
 
     for line in syslog:
-        line = line.decode("utf-8")
-        if domain_rpz_name in line:
-            if "QNAME" in line and "SOA" not in line:
-                fields = line.strip().split(" ")
-                if domain_rpz_name.lower() in line.lower() and len(fields) > 11:
+        if domain_rpz_search in line:
+            if b"QNAME" in line and b"SOA" not in line:
+                text = line.decode("utf-8")
+                fields = text.split(" ")
+                if len(fields) > 11:
                     ip_address_field = find_rpz_ip_field(fields).split("#")
                     ip_address = ip_address_field[0]
                     rpz_domain_fields = find_rpz_domain_field(fields).split("/")
                     rpz_domain = rpz_domain_fields[0]
                     rpz_ip_dict[ip_address] += 1
                     if domain_rpz_name:
-                        rpz_domain_list.append(rpz_domain)
+                        rpz_domain_set.add(rpz_domain)
                     line_count += 1
 
-    rpz_ip_list_sorted = sort_dict(rpz_ip_dict)
-    rpz_domain_set = sorted(set(rpz_domain_list))
+    rpz_ip_list_sorted = sort_dict(rpz_ip_dict, top)
+    rpz_domain_list_sorted = sorted(rpz_domain_set)
     elapsed_time = timeit.default_timer() - start_time
 
     print(f"{domain_rpz_name} total queries: {line_count}")
     print("ip addresses: ")
 
-    for ip_address, query_count in rpz_ip_list_sorted:
-        print(query_count, "\t", ip_address)
+    print_lines(
+        f"{query_count} \t {ip_address}"
+        for ip_address, query_count in rpz_ip_list_sorted
+    )
 
     if domain_rpz_name:
         print("\nrpz names: ")
 
-        for domain_names_found in rpz_domain_set:
-            print(domain_names_found)
+        print_lines(rpz_domain_list_sorted)
 
     if not quiet_mode:
         print(
@@ -265,13 +264,14 @@ def dnscl_record_ip(
     filename: str = FILENAME,
     tail_num: int = 0,
     quiet_mode: bool = False,
+    top: int = 0,
 ) -> int:
     """Return record types queried by a client IP address."""
     start_time = timeit.default_timer()
-    record_dict: DefaultDict = defaultdict(int)
-    domain_list = []
+    record_dict: Counter = Counter()
+    domain_set: Set[str] = set()
     line_count = 0
-    ip_address_search = ip_address + "#"
+    ip_address_search = (ip_address + "#").encode()
 
     if tail_num:
         syslog = tail(filename, tail_num)
@@ -279,34 +279,34 @@ def dnscl_record_ip(
         syslog = tail(filename)
 
     for line in syslog:
-        line = line.decode("utf-8")
         if ip_address_search in line:
-            if "query:" in line:
-                fields = line.strip().split(" ")
-                record_type = find_record_type_field(fields)
-                if len(fields) > 12:
+            if b"query:" in line:
+                text = line.decode("utf-8")
+                _, domain, record_type = find_query_fields(text)
+                if domain is not None and record_type is not None:
                     record_dict[record_type] += 1
-                    domain_list.append(find_domain_field(fields))
+                    domain_set.add(domain)
                     line_count += 1
 
-    record_list_sorted = sort_dict(record_dict)
+    record_list_sorted = sort_dict(record_dict, top)
     elapsed_time = timeit.default_timer() - start_time
 
     print(f"{ip_address} total queries: {line_count}")
     print("queries: ")
 
-    for record_type, query_count in record_list_sorted:
-        print(query_count, "\t", record_type)
+    print_lines(
+        f"{query_count} \t {record_type}"
+        for record_type, query_count in record_list_sorted
+    )
 
     if ip_address:
         print("\ndomain names: ")
-        for domain_names_found in sorted(set(domain_list)):
-            print(domain_names_found)
+        print_lines(sorted(domain_set))
 
     if not quiet_mode:
         print(
             f"\nSummary: Searched {ip_address} and found {line_count}",
-            f"queries with {len(set(record_dict))} record types for {len(set(domain_list))}",
+            f"queries with {len(record_dict)} record types for {len(domain_set)}",
             "domains.",
         )
         print(f"Query time: {round(elapsed_time, 2)} seconds")
@@ -318,12 +318,13 @@ def dnscl_record_domain(
     filename: str = FILENAME,
     tail_num: int = 0,
     quiet_mode: bool = False,
+    top: int = 0,
 ) -> int:
     """Return record types for a queried domain name."""
     start_time = timeit.default_timer()
-    record_dict: DefaultDict = defaultdict(int)
-    ip_list = []
-    domain_list = []
+    record_dict: Counter = Counter()
+    ip_set: Set[str] = set()
+    domain_set: Set[str] = set()
     line_count = 0
 
     if tail_num:
@@ -332,39 +333,43 @@ def dnscl_record_domain(
         syslog = tail(filename)
 
     for line in syslog:
-        line = line.decode("utf-8")
-        fields = line.strip().split(" ")
-        if domain_name.lower() in line.lower() and "query:" in line:
-            ip_address = find_ip_field(fields).split("#")
-            ip_list.append(ip_address[0])
-            record_type = find_record_type_field(fields)
-            record_dict[record_type] += 1
-            if domain_name:
-                domain_list.append(find_domain_field(fields))
-            line_count += 1
-
-    record_list_sorted = sort_dict(record_dict)
+        if b"query:" in line:
+            text = line.decode("utf-8")
+            ip_address, domain, record_type = find_query_fields(text)
+            if (
+                ip_address is not None
+                and domain is not None
+                and record_type is not None
+                and domain_name.lower() in text.lower()
+            ):
+                ip_set.add(ip_address)
+                record_dict[record_type] += 1
+                if domain_name:
+                    domain_set.add(domain)
+                line_count += 1
+
+    record_list_sorted = sort_dict(record_dict, top)
     elapsed_time = timeit.default_timer() - start_time
 
     print(f"{domain_name} total queries: {line_count}")
     print("record types: ")
 
-    for record_type, query_count in record_list_sorted:
-        print(query_count, "\t", record_type)
+    print_lines(
+        f"{query_count} \t {record_type}"
+        for record_type, query_count in record_list_sorted
+    )
 
     if domain_name:
         print("\ndomain names: ")
-        for domain_names_found in sorted(set(domain_list)):
-            print(domain_names_found)
+        print_lines(sorted(domain_set))
 
         print("\nip addresses: ")
-        for ip_addresses_found in sorted(set(ip_list)):
-            print(ip_addresses_found)
+        print_lines(sorted(ip_set))
 
     if not quiet_mode:
         print(
             f"\nSummary: Searched {domain_name} and found {line_count}",
-            f"queries for {len(record_dict)} record types from {len(set(ip_list))} clients.",
+            f"queries for {len(record_dict)} record types from {len(ip_set)} clients.",
         )
         print(f"Query time: {round(elapsed_time, 2)} seconds")
     return line_count
@@ -375,12 +380,15 @@ def dnscl_record_type(
     filename: str = FILENAME,
     tail_num: int = 0,
     quiet_mode: bool = False,
+    top: int = 0,
 ) -> int:
     """Return domain names of a particular record type."""
     start_time = timeit.default_timer()
-    record_domain_dict: DefaultDict = defaultdict(int)
-    record_ip_list = []
+    record_domain_dict: Counter = Counter()
+    record_ip_set: Set[str] = set()
     line_count = 0
+    record_search = record_type.upper()
+    record_needle = (" " + record_search).encode()
 
     if tail_num:
         syslog = tail(filename, tail_num)
@@ -388,111 +396,105 @@ def dnscl_record_type(
         syslog = tail(filename)
 
     for line in syslog:
-        line = line.decode("utf-8")
-        if "query:" in line:
-            fields = line.strip().split(" ")
-            if record_type.upper() == find_record_type_field(fields):
-                record_domain = find_domain_field(fields)
+        if record_needle in line and b"query:" in line:
+            text = line.decode("utf-8")
+            ip_address, record_domain, query_type = find_query_fields(text)
+            if ip_address is not None and record_search == query_type:
                 record_domain_dict[record_domain] += 1
-                ip_address = find_ip_field(fields).split("#")
-                record_ip_list.append(ip_address[0])
+                record_ip_set.add(ip_address)
                 line_count += 1
 
-    record_domain_list_sorted = sort_dict(record_domain_dict)
+    record_domain_list_sorted = sort_dict(record_domain_dict, top)
     elapsed_time = timeit.default_timer() - start_time
 
     print(f"record type {record_type.upper()} total queries: {line_count}")
     print("queries: ")
 
-    for domain_name, query_count in record_domain_list_sorted:
-        print(query_count, "\t", domain_name)
+    print_lines(
+        f"{query_count} \t {domain_name}"
+        for domain_name, query_count in record_domain_list_sorted
+    )
 
     print("\nip addresses: ")
-    for ip_addresses_found in set(record_ip_list):
-        print(ip_addresses_found)
+    print_lines(record_ip_set)
 
     if not quiet_mode:
         print(
             f"\nSummary: Searched record type {record_type.upper()} and found",
             f"{line_count} queries for",
             f"{len(record_domain_dict)} domains from",
-            f"{len(set(record_ip_list))} clients.",
+            f"{len(record_ip_set)} clients.",
         )
         print("Query time:", str(round(elapsed_time, 2)), "seconds")
     return line_count
 
 
-def find_domain_field(fields: List[str]):
-    """Find and return domain field value."""
-    field_index = 0
-    for field in fields:
-        if field == "query:":
-            field_value = fields[field_index + 1]
-            return field_value
-        field_index += 1
-    return None
-
-
-def find_ip_field(fields: List[str]):
-    """Find and return ip field value."""
-    field_index = 0
-    for field in fields:
-        if field == "query:":
-            field_value = fields[field_index - 2]
-            return field_value
-        field_index += 1
-    return None
+def find_query_fields(line: str) -> Tuple[Optional[str], ...]:
+    """Find and return ip, domain and record type field values of a query line."""
+    client, query, query_tail = line.partition(" query: ")
+    client_fields = client.rsplit(" ", 2)
+    if not query or len(client_fields) < 3:
+        return None, None, None
+    query_fields = query_tail.split(" ", 3)
+    record_type = query_fields[2] if len(query_fields) > 2 else None
+    return client_fields[1].partition("#")[0], query_fields[0], record_type
 
 
 def find_rpz_domain_field(fields: List[str]):
     """Find and return rpz domain field."""
-    field_index = 0
-    for field in fields:
-        if field == "QNAME":
-            field_value = fields[field_index + 3]
-            return field_value
-        field_index += 1
-    return None
+    try:
+        field_index = fields.index("QNAME")
+    except ValueError:
+        return None
+    field_value = fields[field_index + 3]
+    return field_value
 
 
 def find_rpz_ip_field(fields: List[str]):
     """Find and return rpz ip field value."""
-    field_index = 0
-    for field in fields:
-        if field == "QNAME":
-            field_value = fields[field_index - 3]
-            return field_value
-        field_index += 1
-    return None
-
-
-def find_record_type_field(fields: List[str]):
-    """Find and return record type field."""
-    field_index = 0
-    for field in fields:
-        if field == "query:":
-            field_value = fields[field_index + 3]
-            return field_value
-        field_index += 1
-    return None
-
-
-def sort_dict(dict_unsorted: DefaultDict) -> List:
-    """Sort dictionary by values in reverse order."""
-    list_sorted = sorted(
-        dict_unsorted.items(), key=lambda dict_sort: dict_sort[1], reverse=True
-    )
+    try:
+        field_index = fields.index("QNAME")
+    except ValueError:
+        return None
+    field_value = fields[field_index - 3]
+    return field_value
+
+
+def print_lines(lines: Iterable[str]) -> None:
+    """Print lines with a single write."""
+    output = list(lines)
+    output.append("")  # end last line with a newline
+    try:
+        sys.stdout.write("\n".join(output))
+    except BrokenPipeError:
+        sys.exit(1)
+
+
+def sort_dict(dict_unsorted: Counter, top: int = 0) -> List:
+    """Sort dictionary by values in reverse order, keeping top results if set."""
+    list_sorted = dict_unsorted.most_common(top or None)
     return list_sorted
 
 
-def tail(filename: str, num_lines: int = 60):
+def tail(filename: str, num_lines: int = 60) -> List[bytes]:
     """Returns n number of last lines from input file."""
-    proc = subprocess.Popen(
-        ["tail", "-n", str(num_lines), filename], stdout=subprocess.PIPE
-    )
-    assert proc.stdout is not None
-    lines = proc.stdout.readlines()
-    return lines
+    with open(filename, "rb") as syslog:
+        try:
+            syslog_map = mmap.mmap(syslog.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError):
+            # empty files and pipes cannot be memory-mapped
+            return [line.rstrip(b"\n") for line in deque(syslog, num_lines)]
+    with syslog_map:
+        offset = len(syslog_map)
+        newline_count = 0
+        while offset and newline_count <= num_lines:
+            block_start = max(offset - 65536, 0)
+            newline_count += syslog_map[block_start:offset].count(b"\n")
+            offset = block_start
+        lines = syslog_map[offset:].split(b"\n")
+    if not lines[-1]:
+        lines.pop()
+    return lines[-num_lines:]
 
 
 if __name__ == "__main__":
@@ -516,21 +518,33 @@ if __name__ == "__main__":
         parser_ip.add_argument("-d", help="domain", default=WILDCARD)
         parser_ip.add_argument("-f", "--file", help="filename", default=FILENAME)
         parser_ip.add_argument("-n", help="lines to tail", type=int, default=0)
+        parser_ip.add_argument(
+            "--top", help="number of results to show", type=int, default=0
+        )
         parser_ip.add_argument("-q", "--quiet", help="quiet mode", action="store_true")
         parser_domain.add_argument("-d", help="domain", default=WILDCARD)
         parser_domain.add_argument("-i", help="ip address", default=WILDCARD)
         parser_domain.add_argument("-f", "--file", help="filename", default=FILENAME)
-        parser_domain.add_argument("-n", help="lines to tail", default=0)
+        parser_domain.add_argument("-n", help="lines to tail", type=int, default=0)
+        parser_domain.add_argument(
+            "--top", help="number of results to show", type=int, default=0
+        )
         parser_domain.add_argument(
             "-q", "--quiet", help="quiet mode", action="store_true"
         )
         parser_rpz.add_argument("-r", help="rpz domain", default=WILDCARD)
         parser_rpz.add_argument("-f", "--file", help="filename", default=FILENAME)
-        parser_rpz.add_argument("-n", help="lines to tail", default=0)
+        parser_rpz.add_argument("-n", help="lines to tail", type=int, default=0)
+        parser_rpz.add_argument(
+            "--top", help="number of results to show", type=int, default=0
+        )
         parser_rpz.add_argument("-q", "--quiet", help="quiet mode", action="store_true")
         parser_type.add_argument("-t", help="record type", default=WILDCARD)
         parser_type.add_argument("-f", "--file", help="filename", default=FILENAME)
-        parser_type.add_argument("-n", help="lines to tail", default=0)
+        parser_type.add_argument("-n", help="lines to tail", type=int, default=0)
+        parser_type.add_argument(
+            "--top", help="number of results to show", type=int, default=0
+        )
         parser_type.add_argument(
             "-q", "--quiet", help="quiet mode", action="store_true"
         )
@@ -541,18 +555,20 @@ if __name__ == "__main__":
             version="%(prog)s " + __version__ + ", " + __author__ + " (c) 2020",
         )
         args = dnscl_parser.parse_args()
+        if args.command and args.top < 0:
+            dnscl_parser.error("argument --top: must not be negative")
 
         if args.command == "ip":
-            dnscl_ipaddress(args.i, args.file, args.d, args.n, args.quiet)
+            dnscl_ipaddress(args.i, args.file, args.d, args.n, args.quiet, args.top)
         elif args.command == "domain":
-            dnscl_domain(args.d, args.file, args.i, args.n, args.quiet)
+            dnscl_domain(args.d, args.file, args.i, args.n, args.quiet, args.top)
         elif args.command == "rpz":
             if args.r == WILDCARD:
-                dnscl_rpz(args.r, args.file, args.n, args.quiet)
+                dnscl_rpz(args.r, args.file, args.n, args.quiet, args.top)
             else:
-                dnscl_rpz_domain(args.r, args.file, args.n, args.quiet)
+                dnscl_rpz_domain(args.r, args.file, args.n, args.quiet, args.top)
         elif args.command == "type":
             if args.t == WILDCARD:
-                dnscl_record_domain(args.t, args.file, args.n, args.quiet)
+                dnscl_record_domain(args.t, args.file, args.n, args.quiet, args.top)
             else:
-                dnscl_record_type(args.t, args.file, args.n, args.quiet)
+                dnscl_record_type(args.t, args.file, args.n, args.quiet, args.top)
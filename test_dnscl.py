@@ -0,0 +1,124 @@
+"""Tests for the dnscl command line program."""
+import os
+import subprocess
+import sys
+import tempfile
+import unittest
+from unittest import mock
+
+import dnscl
+from test_dnscl_scan import syslog_lines, write_syslog
+
+
+class ScanFileTest(unittest.TestCase):
+    """scan_file reuses results while the syslog file is unchanged."""
+
+    def setUp(self):
+        self.filename = write_syslog(syslog_lines(50))
+        self.addCleanup(os.remove, self.filename)
+        dnscl.scan_cache.clear()
+        patcher = mock.patch.object(dnscl, "run_scan", wraps=dnscl.run_scan)
+        self.run_scan = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def scan(self, jobs=1, domain_name="foo"):
+        return dnscl.scan_file(dnscl.scan_domain, self.filename, jobs, domain_name, "")
+
+    def test_cached(self):
+        results = self.scan()
+        self.assertEqual(self.scan(), results)
+        self.assertEqual(self.run_scan.call_count, 1)
+
+    def test_jobs_not_in_key(self):
+        results = self.scan(jobs=1)
+        self.assertEqual(self.scan(jobs=2), results)
+        self.assertEqual(self.run_scan.call_count, 1)
+        self.assertEqual(len(dnscl.scan_cache), 1)
+
+    def test_file_changed(self):
+        line_count = self.scan()[2]
+        with open(self.filename, "a", encoding=dnscl.ENCODING) as syslog:
+            syslog.write(syslog_lines(1)[0] + "\n")
+        self.assertEqual(self.scan()[2], line_count + 1)
+        self.assertEqual(self.run_scan.call_count, 2)
+
+    def test_cache_size(self):
+        for number in range(dnscl.SCAN_CACHE_SIZE + 5):
+            self.scan(domain_name=f"foo{number}")
+        self.assertEqual(len(dnscl.scan_cache), dnscl.SCAN_CACHE_SIZE)
+        self.scan(domain_name=f"foo{dnscl.SCAN_CACHE_SIZE + 4}")
+        self.assertEqual(self.run_scan.call_count, dnscl.SCAN_CACHE_SIZE + 5)
+
+
+def write_domain_list(test, text):
+    """Write a temporary domain list file removed after the test."""
+    domain_file, filename = tempfile.mkstemp(suffix=".txt")
+    test.addCleanup(os.remove, filename)
+    with os.fdopen(domain_file, "w", encoding=dnscl.ENCODING) as domain_list:
+        domain_list.write(text)
+    return filename
+
+
+class DomainListSearchTest(unittest.TestCase):
+    """domain_list_search skips blank lines and comments."""
+
+    def list_search(self, text):
+        return dnscl.domain_list_search(write_domain_list(self, text))
+
+    def test_comments(self):
+        text = "# blocked\n\n  x.com  \n    # indented comment\n\t\nwww.foo.org\n"
+        self.assertEqual(self.list_search(text), r"x\.com|www\.foo\.org")
+
+    def test_empty(self):
+        self.assertEqual(self.list_search("\n  # nothing here\n\n"), "")
+
+
+class MainTest(unittest.TestCase):
+    """Command line arguments are checked before searching."""
+
+    def setUp(self):
+        self.filename = write_syslog(syslog_lines(50))
+        self.addCleanup(os.remove, self.filename)
+
+    def run_dnscl(self, *args):
+        return subprocess.run(
+            [sys.executable, dnscl.__file__, *args, "-f", self.filename],
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            universal_newlines=True,
+            check=False,
+        )
+
+    def test_top(self):
+        result = self.run_dnscl("ip", "-n", "2")
+        self.assertEqual(result.returncode, 0)
+        rows = result.stdout.split("results:\n")[1].split("\n\n")[0]
+        self.assertEqual(len(rows.splitlines()), 2)
+
+    def test_negative_top(self):
+        for command in ("ip", "domain", "rpz", "type"):
+            result = self.run_dnscl(command, "-n", "-1")
+            self.assertEqual(result.returncode, 2)
+            self.assertIn("--top: must not be negative", result.stderr)
+
+    def test_domain_list(self):
+        filename = write_domain_list(self, "x.com\n# cdn.bar.net\n")
+        result = self.run_dnscl("domain", "-l", filename)
+        self.assertEqual(result.returncode, 0)
+        self.assertIn(f"Searched {filename} and found 12 queries", result.stdout)
+        result = self.run_dnscl("domain", "-d", "foo", "-l", filename)
+        self.assertEqual(result.returncode, 2)
+        self.assertIn("not allowed with argument", result.stderr)
+
+    def test_empty_domain_list(self):
+        filename = write_domain_list(self, "# none\n")
+        result = self.run_dnscl("domain", "-l", filename)
+        self.assertEqual(result.returncode, 2)
+        self.assertIn("no domain names found", result.stderr)
+        result = self.run_dnscl("domain", "-l", filename + ".missing")
+        self.assertEqual(result.returncode, 2)
+        self.assertIn("cannot read", result.stderr)
+
+
+if __name__ == "__main__":
+    unittest.main()
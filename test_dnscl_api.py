@@ -0,0 +1,104 @@
+"""Tests for the dnscl API search functions."""
+import os
+import unittest
+from unittest import mock
+
+import dnscl_api
+from test_dnscl_scan import syslog_lines, write_syslog
+
+
+class ScanFileTest(unittest.TestCase):
+    """scan_file only scans lines added since the last search."""
+
+    def setUp(self):
+        self.filename = write_syslog(syslog_lines(100))
+        self.addCleanup(os.remove, self.filename)
+        dnscl_api.scan_cache.clear()
+        self.addCleanup(dnscl_api.scan_cache.clear)
+        patcher = mock.patch.object(dnscl_api, "run_scan", wraps=dnscl_api.run_scan)
+        self.run_scan = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def write(self, lines, mode="a", newline=True):
+        with open(self.filename, mode, encoding=dnscl_api.ENCODING) as syslog:
+            syslog.write("\n".join(lines) + ("\n" if newline else ""))
+
+    def assert_scan(self, *search, jobs=1):
+        """Check incremental results match a scan of the whole file."""
+        scan, *args = search or (dnscl_api.scan_ipaddress, "", "")
+        results = dnscl_api.scan_file(scan, self.filename, jobs, *args)
+        self.assertEqual(results, dnscl_api.run_scan(scan, self.filename, 1, *args))
+        return results
+
+    def last_chunk(self):
+        """Return the part of the file scan_file last scanned."""
+        return self.run_scan.call_args_list[-2][1].get("chunk")
+
+    def test_unchanged(self):
+        results = self.assert_scan()
+        self.assertEqual(self.assert_scan(), results)
+        # the second search is answered from the cache
+        self.assertEqual(self.run_scan.call_count, 3)
+        self.assertEqual(len(dnscl_api.scan_cache), 1)
+
+    def test_append(self):
+        self.assert_scan()
+        size = os.path.getsize(self.filename)
+        self.write(syslog_lines(20))
+        self.assertEqual(self.assert_scan()[1], 120)
+        self.assertEqual(self.last_chunk(), (size, os.path.getsize(self.filename)))
+
+    def test_jobs(self):
+        for jobs in (1, 3, 2):
+            self.write(syslog_lines(50))
+            self.assert_scan(dnscl_api.scan_domain, "google|bar", "", jobs=jobs)
+            self.assert_scan(dnscl_api.scan_record_type, "mx", jobs=jobs)
+
+    def test_partial_last_line(self):
+        line = syslog_lines(1)[0]
+        self.write([line[:40]], newline=False)
+        self.assertEqual(self.assert_scan()[1], 100)
+        self.write([line[40:]] + syslog_lines(4), newline=False)
+        self.assertEqual(self.assert_scan()[1], 105)
+        self.write([""])
+        self.assertEqual(self.assert_scan()[1], 105)
+        self.assertEqual(self.assert_scan()[1], 105)
+
+    def test_truncate(self):
+        self.assert_scan()
+        self.write(syslog_lines(10)[::-1], mode="w")
+        self.assertEqual(self.assert_scan()[1], 10)
+        self.assert_scan()
+        self.write(syslog_lines(150)[::-1], mode="w")
+        self.assertEqual(self.assert_scan()[1], 150)
+        self.assertEqual(self.last_chunk(), (0, os.path.getsize(self.filename)))
+
+    def test_rotate(self):
+        self.assert_scan(dnscl_api.scan_rpz, "")
+        rotated = write_syslog(syslog_lines(150)[::-1])
+        os.replace(rotated, self.filename)
+        self.assert_scan(dnscl_api.scan_rpz, "")
+        self.assertEqual(self.last_chunk(), (0, os.path.getsize(self.filename)))
+
+
+class TopTest(unittest.TestCase):
+    """Searches return only the top results when asked to."""
+
+    def setUp(self):
+        filename = write_syslog(syslog_lines(100))
+        self.addCleanup(os.remove, filename)
+        patcher = mock.patch.object(dnscl_api, "FILENAME", filename)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        dnscl_api.scan_cache.clear()
+        self.addCleanup(dnscl_api.scan_cache.clear)
+
+    def test_top(self):
+        for top, rows in ((0, 4), (2, 2), (10, 4)):
+            results = dnscl_api.dnscl_ipaddress("", top=top)
+            queries = results.split("queries: \n")[1].split("\n\n")[0]
+            self.assertEqual(len(queries.splitlines()), rows)
+
+
+if __name__ == "__main__":
+    unittest.main()
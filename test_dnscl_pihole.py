@@ -0,0 +1,96 @@
+"""Tests for the dnscl Pi-hole program."""
+import argparse
+import io
+import os
+import subprocess
+import sys
+import tempfile
+import unittest
+from collections import OrderedDict
+from contextlib import redirect_stdout
+from unittest import mock
+
+import dnscl_pihole
+
+QUERY_LINE = "Jan 10 12:00:{second:02} dnsmasq[1234]: query[A] {domain} from {client}"
+DOMAINS = ("www.foo.org", "mail.google.com", "cdn.bar.net")
+
+
+class PiholeLogTest(unittest.TestCase):
+    """Searches of a Pi-hole log with 30 queries from two clients."""
+
+    def setUp(self):
+        lines = [
+            QUERY_LINE.format(
+                second=number, domain=DOMAINS[number % 3], client=f"10.0.0.{number % 2}"
+            )
+            for number in range(30)
+        ]
+        piholelog, filename = tempfile.mkstemp(suffix=".log")
+        with os.fdopen(piholelog, "w", encoding="UTF-8") as piholelog_file:
+            piholelog_file.write("\n".join(lines) + "\n")
+        self.addCleanup(os.remove, filename)
+        patcher = mock.patch.multiple(
+            dnscl_pihole, FILENAME=filename, query_cache=OrderedDict()
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+        self.filename = filename
+
+    def search(self, ip_address, tail_hits):
+        output = io.StringIO()
+        with redirect_stdout(output):
+            dnscl_pihole.dnscl_ipaddress(ip_address, tail_hits)
+        return output.getvalue()
+
+    def test_tail(self):
+        self.assertIn(" total queries: 4\n", self.search("", 4))
+        self.assertIn("10.0.0.1 total queries: 5\n", self.search("10.0.0.1", 5))
+        output = self.search("10.0.0.0", 1)
+        self.assertIn("1\t mail.google.com\n", output)
+
+    def test_all(self):
+        self.assertIn(" total queries: 30\n", self.search("", 0))
+        self.assertIn(" total queries: 30\n", self.search("", 100))
+
+    def test_query_cache(self):
+        with mock.patch.object(
+            dnscl_pihole, "run_scan", wraps=dnscl_pihole.run_scan
+        ) as run_scan:
+            for _ in range(3):
+                self.assertEqual(sum(dnscl_pihole.scan_queries().values()), 30)
+            self.assertEqual(run_scan.call_count, 1)
+            for query_count in range(31, 34):
+                with open(self.filename, "a", encoding="UTF-8") as piholelog:
+                    piholelog.write(
+                        QUERY_LINE.format(second=0, domain="x.com", client="10.0.0.2")
+                        + "\n"
+                    )
+                self.assertEqual(sum(dnscl_pihole.scan_queries().values()), query_count)
+                self.assertEqual(
+                    len(dnscl_pihole.query_cache), dnscl_pihole.QUERY_CACHE_SIZE
+                )
+            self.assertEqual(run_scan.call_count, 4)
+
+    def test_tail_count(self):
+        self.assertEqual(dnscl_pihole.tail_count("0"), 0)
+        self.assertEqual(dnscl_pihole.tail_count("12"), 12)
+        for value in ("-1", "x"):
+            with self.assertRaises(argparse.ArgumentTypeError):
+                dnscl_pihole.tail_count(value)
+
+    def test_negative_tail(self):
+        result = subprocess.run(
+            [sys.executable, dnscl_pihole.__file__, "ip", "-t", "-1"],
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            universal_newlines=True,
+            check=False,
+        )
+        self.assertEqual(result.returncode, 2)
+        self.assertIn("-t/--tail: must not be negative", result.stderr)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,183 @@
+"""Tests for the shared dnscl scan engine."""
+import os
+import tempfile
+import unittest
+from collections import Counter
+
+import dnscl_scan
+
+QUERY_LINE = (
+    "Jan 10 12:00:{second:02} ns1 named[1234]: client @0x7f1234567890 "
+    "{client}#4801 ({domain}): query: {domain} IN {record_type} +E(0)K (10.0.0.1)"
+)
+RPZ_LINE = (
+    "Jan 10 12:00:{second:02} ns1 named[1234]: client @0x7f12 {client}#5353 "
+    "({domain}): rpz QNAME NXDOMAIN rewrite {domain}/A/IN via {domain}.rpz"
+)
+DOMAINS = ("www.foo.org", "mail.google.com", "cdn.bar.net", "x.com")
+RECORD_TYPES = ("A", "AAAA", "MX", "PTR")
+
+
+def syslog_lines(count):
+    """Return query and rpz lines for a test syslog file."""
+    lines = []
+    for number in range(count):
+        fields = {
+            "second": number % 60,
+            "client": f"10.0.0.{number % 7}",
+            "domain": DOMAINS[number % len(DOMAINS)],
+            "record_type": RECORD_TYPES[number % len(RECORD_TYPES)],
+        }
+        lines.append(QUERY_LINE.format(**fields))
+        if number % 5 == 0:
+            lines.append(RPZ_LINE.format(**fields))
+    return lines
+
+
+def write_syslog(lines, newline=True):
+    """Write lines to a temporary syslog file and return its path."""
+    syslog, filename = tempfile.mkstemp(suffix=".log")
+    with os.fdopen(syslog, "w", encoding=dnscl_scan.ENCODING) as syslog_file:
+        syslog_file.write("\n".join(lines) + ("\n" if newline else ""))
+    return filename
+
+
+class SplitFileTest(unittest.TestCase):
+    """split_file chunks cover the file and start at line boundaries."""
+
+    def setUp(self):
+        self.filename = write_syslog(syslog_lines(200))
+        self.addCleanup(os.remove, self.filename)
+        with open(self.filename, "rb") as syslog:
+            self.data = syslog.read()
+
+    def assert_chunks(self, chunks, start, end):
+        self.assertEqual(chunks[0][0], start)
+        self.assertEqual(chunks[-1][1], end)
+        for (_, chunk_end), (chunk_start, _) in zip(chunks, chunks[1:]):
+            self.assertEqual(chunk_end, chunk_start)
+            self.assertTrue(self.data[:chunk_start].endswith(b"\n"))
+
+    def test_whole_file(self):
+        for jobs in range(2, 8):
+            chunks = dnscl_scan.split_file(self.filename, jobs)
+            self.assertEqual(len(chunks), jobs)
+            self.assert_chunks(chunks, 0, len(self.data))
+
+    def test_single_job(self):
+        self.assertEqual(dnscl_scan.split_file(self.filename, 1), [(0, None)])
+
+    def test_range(self):
+        start = self.data.index(b"\n", 1000) + 1
+        end = self.data.index(b"\n", 9000) + 1
+        for jobs in range(2, 6):
+            chunks = dnscl_scan.split_file(self.filename, jobs, start, end)
+            self.assert_chunks(chunks, start, end)
+
+    def test_more_jobs_than_lines(self):
+        filename = write_syslog(syslog_lines(2))
+        self.addCleanup(os.remove, filename)
+        chunks = dnscl_scan.split_file(filename, 8)
+        self.assertLessEqual(len(chunks), 3)
+        self.assertEqual(chunks[-1][1], os.path.getsize(filename))
+
+
+class RunScanTest(unittest.TestCase):
+    """run_scan merges chunk results into the single process result."""
+
+    def setUp(self):
+        self.filename = write_syslog(syslog_lines(300), newline=False)
+        self.addCleanup(os.remove, self.filename)
+
+    def assert_jobs_match(self, scan, *args):
+        expected = dnscl_scan.run_scan(scan, self.filename, 1, *args)
+        for jobs in (2, 3):
+            with self.subTest(scan=scan.__name__, jobs=jobs):
+                self.assertEqual(
+                    dnscl_scan.run_scan(scan, self.filename, jobs, *args), expected
+                )
+        return expected
+
+    def test_scans(self):
+        self.assert_jobs_match(dnscl_scan.scan_ipaddress, "", "")
+        self.assert_jobs_match(dnscl_scan.scan_ipaddress, "10.0.0.3", "foo")
+        self.assert_jobs_match(dnscl_scan.scan_domain, "google|bar", "")
+        self.assert_jobs_match(dnscl_scan.scan_rpz, "")
+        self.assert_jobs_match(dnscl_scan.scan_rpz_domain, "x.com")
+        self.assert_jobs_match(dnscl_scan.scan_record_ip, "10.0.0.1")
+        self.assert_jobs_match(dnscl_scan.scan_record_domain, "foo")
+        self.assert_jobs_match(dnscl_scan.scan_record_type, "mx")
+
+    def test_counts(self):
+        domain_dict, line_count = self.assert_jobs_match(
+            dnscl_scan.scan_ipaddress, "", ""
+        )
+        self.assertEqual(line_count, 300)
+        self.assertEqual(domain_dict[b"x.com"], 75)
+
+    def test_chunk(self):
+        size = os.path.getsize(self.filename)
+        results = dnscl_scan.run_scan(
+            dnscl_scan.scan_ipaddress, self.filename, 2, "", "", chunk=(size, size)
+        )
+        self.assertEqual(results, (Counter(), 0))
+
+
+class EncodeSearchTest(unittest.TestCase):
+    """Search terms the syslog encoding cannot hold match nothing."""
+
+    def setUp(self):
+        lines = syslog_lines(20)
+        fields = {"second": 0, "client": "10.0.0.9", "record_type": "A"}
+        for domain in ("b?cher.de", "bücher.de"):
+            lines.append(QUERY_LINE.format(domain=domain, **fields))
+            lines.append(RPZ_LINE.format(domain=domain, **fields))
+        self.filename = write_syslog(lines)
+        self.addCleanup(os.remove, self.filename)
+
+    def scan(self, scan, *args):
+        return dnscl_scan.run_scan(scan, self.filename, 1, *args)
+
+    def test_encode(self):
+        self.assertEqual(dnscl_scan.encode_search("bücher"), b"b\xfccher")
+        self.assertIsNone(dnscl_scan.encode_search("b\u0101cher"))
+
+    def test_unencodable_matches_nothing(self):
+        term = "b\u0101cher"
+        self.assertFalse(dnscl_scan.search_matcher(term)(b"b?cher.de"))
+        self.assertEqual(self.scan(dnscl_scan.scan_domain, term, "")[2], 0)
+        self.assertEqual(self.scan(dnscl_scan.scan_domain, "", term)[2], 0)
+        self.assertEqual(self.scan(dnscl_scan.scan_ipaddress, "", term)[1], 0)
+        self.assertEqual(self.scan(dnscl_scan.scan_ipaddress, term, "")[1], 0)
+        self.assertEqual(self.scan(dnscl_scan.scan_rpz, term)[1], 0)
+        self.assertEqual(self.scan(dnscl_scan.scan_rpz_domain, term)[2], 0)
+        self.assertEqual(self.scan(dnscl_scan.scan_record_ip, term)[2], 0)
+        self.assertEqual(self.scan(dnscl_scan.scan_record_domain, term)[3], 0)
+        self.assertEqual(self.scan(dnscl_scan.scan_record_type, "\u0101")[2], 0)
+
+    def test_latin_1_matches(self):
+        self.assertEqual(self.scan(dnscl_scan.scan_domain, "BÜCHER", "")[2], 1)
+        self.assertEqual(self.scan(dnscl_scan.scan_rpz_domain, "bücher")[2], 1)
+        self.assertEqual(self.scan(dnscl_scan.scan_record_domain, "bücher")[3], 1)
+
+
+class MergeResultsTest(unittest.TestCase):
+    """merge_results adds counters and counts and combines sets."""
+
+    def test_merge(self):
+        results = (Counter({b"a": 1}), {b"x"}, 1)
+        other_results = (Counter({b"a": 2, b"b": 1}), {b"y"}, 3)
+        self.assertEqual(
+            dnscl_scan.merge_results(results, other_results),
+            (Counter({b"a": 3, b"b": 1}), {b"x", b"y"}, 4),
+        )
+
+    def test_merge_counter(self):
+        self.assertEqual(
+            dnscl_scan.merge_results(Counter(a=1), Counter(a=1, b=2)),
+            Counter(a=2, b=2),
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
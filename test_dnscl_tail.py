@@ -0,0 +1,41 @@
+"""Tests for the dnscl_tail command line program."""
+import os
+import subprocess
+import sys
+import unittest
+
+import dnscl_tail
+from test_dnscl_scan import syslog_lines, write_syslog
+
+
+class MainTest(unittest.TestCase):
+    """Command line arguments are checked before searching."""
+
+    def setUp(self):
+        self.filename = write_syslog(syslog_lines(50))
+        self.addCleanup(os.remove, self.filename)
+
+    def run_tail(self, *args):
+        return subprocess.run(
+            [sys.executable, dnscl_tail.__file__, *args, "-f", self.filename],
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            universal_newlines=True,
+            check=False,
+        )
+
+    def test_top(self):
+        result = self.run_tail("ip", "-n", "20", "--top", "2")
+        self.assertEqual(result.returncode, 0)
+        rows = result.stdout.split("queries: \n")[1].split("\n\n")[0]
+        self.assertEqual(len(rows.splitlines()), 2)
+
+    def test_negative_top(self):
+        for command in ("ip", "domain", "rpz", "type"):
+            result = self.run_tail(command, "--top", "-1")
+            self.assertEqual(result.returncode, 2)
+            self.assertIn("--top: must not be negative", result.stderr)
+
+
+if __name__ == "__main__":
+    unittest.main()